@@ -30,6 +30,12 @@ if FILENAME not in project_dir_content:
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_dataset',
+    'tests.fixtures.fixture_cache',
+    'tests.fixtures.fixture_throttle',
+    'tests.fixtures.fixture_replica',
+    'tests.fixtures.fixture_metrics',
+    'tests.fixtures.fixture_slowlog',
 ]
 
 # test .md
@@ -0,0 +1,21 @@
+import pytest
+from django.core.cache import cache
+
+from api.authentication import user_cache
+from api.revocation import revoked_tokens
+from api.tokens import verified_tokens
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    """Drop cached responses, users and tokens left by previous tests."""
+    default = {**settings.CACHES['default'], 'LOCATION': tmp_path / 'cache'}
+    settings.CACHES = {'default': default}
+    caches = (cache, user_cache, verified_tokens)
+    for item in caches:
+        item.clear()
+    revoked_tokens.reset()
+    yield
+    for item in caches:
+        item.clear()
+    revoked_tokens.reset()
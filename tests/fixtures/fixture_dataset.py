@@ -0,0 +1,72 @@
+import os
+import sqlite3
+
+import pytest
+from django.db import connection
+
+from posts.models import Comment, Follow, Group, Post
+
+# Размеры наборов данных для проверки бюджета запросов. Набор из 100 000
+# записей долго создаётся, поэтому включается переменной окружения.
+DATASET_SIZES = [10, 1_000]
+LARGE_DATASET_SIZE = 100_000
+if os.environ.get('YATUBE_LARGE_DATASETS'):
+    DATASET_SIZES.append(LARGE_DATASET_SIZE)
+
+BATCH_SIZE = 1_000
+
+
+@pytest.fixture
+def dataset(django_user_model, user):
+    """
+    Return a factory that fills the database with ``size`` rows per model.
+
+    Every post, comment and follow gets its own author so that a missing
+    ``select_related`` shows up as one extra query per row.
+    """
+
+    def make(size):
+        django_user_model.objects.bulk_create(
+            (django_user_model(username=f'author_{i}') for i in range(size)),
+            batch_size=BATCH_SIZE,
+        )
+        # SQLite не возвращает первичные ключи из bulk_create.
+        authors = list(
+            django_user_model.objects.filter(username__startswith='author_')
+        )
+        Group.objects.bulk_create(
+            (Group(title=f'Группа {i}', slug=f'group-{i}')
+             for i in range(size)),
+            batch_size=BATCH_SIZE,
+        )
+        Post.objects.bulk_create(
+            (Post(text=f'Пост {i}', author=author)
+             for i, author in enumerate(authors)),
+            batch_size=BATCH_SIZE,
+        )
+        post = Post.objects.earliest('id')
+        Comment.objects.bulk_create(
+            (Comment(text=f'Коммент {i}', author=author, post=post)
+             for i, author in enumerate(authors)),
+            batch_size=BATCH_SIZE,
+        )
+        Follow.objects.bulk_create(
+            (Follow(user=user, following=author,
+                    following_username=author.username.lower())
+             for author in authors),
+            batch_size=BATCH_SIZE,
+        )
+        return post
+
+    return make
+
+
+@pytest.fixture
+def keep_test_database(transactional_db):
+    """
+    Keep the in-memory test database alive while a command works on a
+    scratch file: the database disappears with its last connection.
+    """
+    keeper = sqlite3.connect(connection.settings_dict['NAME'], uri=True)
+    yield
+    keeper.close()
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    """Keep the metric files of every test in a separate directory."""
+    settings.API_METRICS_DIR = tmp_path / 'metrics'
+    return settings.API_METRICS_DIR
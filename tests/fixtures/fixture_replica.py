@@ -0,0 +1,32 @@
+import sqlite3
+
+import pytest
+from django.db import connections
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """
+    Attach a second SQLite file as the ``replica`` alias.
+
+    Returns a function that copies the current test database into the
+    replica; changes made after a copy are not replicated, like on a
+    lagging replica.
+    """
+    path = str(tmp_path / 'replica.sqlite3')
+    connections.settings['replica'] = {
+        **connections['default'].settings_dict, 'NAME': path,
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+
+    def sync():
+        connections['replica'].close()
+        connections['default'].ensure_connection()
+        target = sqlite3.connect(path)
+        connections['default'].connection.backup(target)
+        target.close()
+
+    yield sync
+    connections['replica'].close()
+    del connections['replica']
+    del connections.settings['replica']
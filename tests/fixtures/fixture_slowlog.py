@@ -0,0 +1,11 @@
+import pytest
+
+from api.slowlog import reset_plans
+
+
+@pytest.fixture(autouse=True)
+def slow_query_log(settings, tmp_path):
+    """Keep the slow query log of every test in a separate file."""
+    settings.API_SLOW_QUERY_LOG = tmp_path / 'slow_queries.log'
+    reset_plans()
+    return settings.API_SLOW_QUERY_LOG
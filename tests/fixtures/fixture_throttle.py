@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def throttle_store(settings, tmp_path):
+    """Keep throttle buckets of every test in a separate file."""
+    settings.API_THROTTLE_DB = tmp_path / 'throttle.sqlite3'
@@ -0,0 +1,117 @@
+import asyncio
+import importlib
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import resolve
+
+from api.asyncviews import AsyncReadASGIHandler
+from posts.models import Post
+
+
+async def asgi_get(application, path, query_string=''):
+    """Return the status and the body messages of a GET request."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query_string.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    status, bodies = [], []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message.get('body'):
+            bodies.append(message['body'])
+
+    await application(scope, receive, send)
+    return status[0], bodies
+
+
+@pytest.fixture
+def async_urls(settings):
+    settings.ROOT_URLCONF = settings.API_ASYNC_URLCONF
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReads:
+    url = '/api/v1/posts/'
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/posts/', '/api/v1/posts/1/', '/api/v1/posts/1/comments/',
+        '/api/v1/groups/', '/api/v1/groups/1/',
+    ])
+    def test_read_views_are_async(self, settings, url):
+        match = resolve(url, urlconf=settings.API_ASYNC_URLCONF)
+        assert asyncio.iscoroutinefunction(match.func), (
+            f'Проверьте, что под ASGI `{url}` обслуживает асинхронное '
+            'представление.'
+        )
+
+    @pytest.mark.parametrize('enabled, handler', [
+        (False, ASGIHandler), (True, AsyncReadASGIHandler),
+    ])
+    def test_async_views_opt_in(self, settings, enabled, handler):
+        settings.API_ASYNC_VIEWS = enabled
+        from yatube_api import asgi
+        application = importlib.reload(asgi).application
+        assert type(application) is handler, (
+            'Проверьте, что асинхронные представления под ASGI включаются '
+            'только настройкой API_ASYNC_VIEWS.'
+        )
+
+    def test_other_views_unchanged(self, settings):
+        match = resolve('/api/v1/follow/', urlconf=settings.API_ASYNC_URLCONF)
+        assert not asyncio.iscoroutinefunction(match.func)
+
+    def test_list_and_retrieve_match_sync(self, client, async_client, post,
+                                          post_2, comment_1_post, group_1,
+                                          async_urls):
+        for url in (self.url, f'{self.url}{post.id}/',
+                    f'{self.url}{post.id}/comments/', '/api/v1/groups/',
+                    f'/api/v1/groups/{group_1.id}/'):
+            response = asyncio.run(async_client.get(url))
+            assert response.status_code == HTTPStatus.OK
+            assert response.json() == client.get(url).json()
+
+    def test_stream_under_asgi(self, client, user, monkeypatch):
+        Post.objects.bulk_create(
+            Post(author=user, text=f'Пост {i}') for i in range(30)
+        )
+        monkeypatch.setattr(AsyncReadASGIHandler, 'stream_batch_size', 8)
+        status, bodies = asyncio.run(
+            asgi_get(AsyncReadASGIHandler(), self.url, 'stream=1')
+        )
+        assert status == HTTPStatus.OK
+        assert len(bodies) > 2, (
+            'Проверьте, что под ASGI потоковый ответ отправляется частями, '
+            'а не собирается целиком.'
+        )
+        expected = client.get(f'{self.url}?stream=1').streaming_content
+        assert b''.join(bodies) == b''.join(expected)
+
+    def test_write_through_async_route(self, async_client, token, user,
+                                       async_urls):
+        response = asyncio.run(async_client.post(
+            self.url, json.dumps({'text': 'Новый пост'}),
+            content_type='application/json',
+            authorization=f'Bearer {token["access"]}',
+        ))
+        assert response.status_code == HTTPStatus.CREATED
+        assert Post.objects.filter(author=user, text='Новый пост').exists()
+
+    def test_over_limit_rejected(self, async_client, settings, async_urls):
+        settings.API_ASYNC_MAX_CONCURRENCY = 0
+        response = asyncio.run(async_client.get(self.url))
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что запросы сверх API_ASYNC_MAX_CONCURRENCY получают '
+            'статус 503.'
+        )
+        assert response['Retry-After'] == '1'
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+from time import time
+
+import pytest
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.lru import ExpiringLRUCache
+from api.tokens import get_verified_payload, remember_payload
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedJWTAuthentication:
+    url = '/api/v1/follow/'
+
+    def test_user_loaded_once(self, user_client, follow_1,
+                              django_assert_num_queries):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        with django_assert_num_queries(1):
+            response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь из токена берётся из кеша.'
+        )
+
+    def test_deactivated_user_rejected(self, user_client, user):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что деактивация пользователя сбрасывает кеш.'
+
+    def test_deactivated_in_other_process(self, user_client, user,
+                                          monkeypatch):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        # Другой процесс не может очистить кеш этого процесса.
+        monkeypatch.setattr('api.signals.evict_user', lambda user: None)
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что деактивация пользователя в другом процессе '
+            'сбрасывает кеш пользователей во всех процессах.'
+        )
+
+    def test_renamed_user_seen(self, user_client, user, another_user):
+        user_client.get(self.url)
+        user.username = 'Renamed'
+        user.save()
+        response = user_client.post(
+            self.url, data={'following': another_user.username}
+        )
+        assert response.json()['user'] == 'Renamed'
+
+
+class TestExpiringLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = ExpiringLRUCache(maxsize=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert len(cache) == 2
+
+    def test_expired_entries_dropped(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr('api.lru.monotonic', lambda: now[0])
+        cache = ExpiringLRUCache(maxsize=2)
+        cache.set('a', 1, 10)
+        now[0] = 111.0
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    original = TokenBackend.decode
+
+    def decode(self, token, verify=True):
+        calls.append(token)
+        return original(self, token, verify)
+
+    monkeypatch.setattr(TokenBackend, 'decode', decode)
+    return calls
+
+
+@pytest.mark.django_db(transaction=True)
+class TestVerifiedTokenCache:
+    url = '/api/v1/follow/'
+    verify_url = '/api/v1/jwt/verify/'
+
+    def test_token_decoded_once(self, user_client, decode_calls):
+        for _ in range(3):
+            assert user_client.get(self.url).status_code == HTTPStatus.OK
+        assert len(decode_calls) == 1, (
+            'Проверьте, что повторно предъявленный токен не декодируется.'
+        )
+
+    def test_verify_view_uses_cache(self, client, token, user_client,
+                                    decode_calls):
+        user_client.get(self.url)
+        for _ in range(2):
+            response = client.post(
+                self.verify_url, data={'token': token['access']}
+            )
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(
+            self.verify_url, data={'token': token['refresh']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(decode_calls) == 2
+
+    def test_refresh_token_not_accepted_as_access(self, client, token):
+        client.post(self.verify_url, data={'token': token['refresh']})
+        response = client.get(
+            self.url, HTTP_AUTHORIZATION=f'Bearer {token["refresh"]}'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что refresh-токен из кеша не принимается как '
+            'access-токен.'
+        )
+
+    def test_expired_token_not_cached(self, token):
+        payload = AccessToken(token['access']).payload
+        remember_payload(token['access'], {**payload, 'exp': time() - 1})
+        assert get_verified_payload(token['access']) is None
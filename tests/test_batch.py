@@ -0,0 +1,86 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment, Post, Timeline
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBatchCreate:
+    post_batch_url = '/api/v1/posts/batch/'
+    comment_batch_url = '/api/v1/posts/{post_id}/comments/batch/'
+
+    def test_batch_not_auth(self, client):
+        response = client.post(
+            self.post_batch_url, data=json.dumps([{'text': 'Пост'}]),
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_post_batch_create(self, user_client, user, another_user,
+                               follow_4, django_assert_max_num_queries):
+        data = [{'text': f'Пост {i}'} for i in range(20)]
+        # Число запросов не зависит от размера пакета.
+        with django_assert_max_num_queries(10):
+            response = user_client.post(
+                self.post_batch_url, data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос с корректным списком постов к '
+            f'`{self.post_batch_url}` возвращает статус 201.'
+        )
+        results = response.json()['results']
+        assert [result['index'] for result in results] == list(range(20))
+        for item, result in zip(data, results):
+            post = Post.objects.get(id=result['data']['id'])
+            assert post.text == item['text']
+            assert post.author == user
+        assert Timeline.objects.filter(user=another_user).count() == 20, (
+            'Проверьте, что посты из пакета попадают в ленты подписчиков.'
+        )
+
+    def test_post_batch_reports_errors_by_index(self, user_client):
+        data = [{'text': 'Пост'}, {'text': ''}, {}]
+        response = user_client.post(
+            self.post_batch_url, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()['results']
+        assert results[0]['status'] == HTTPStatus.CREATED
+        assert 'text' in results[1]['errors']
+        assert 'text' in results[2]['errors']
+        assert Post.objects.count() == 1
+
+    def test_post_batch_rejects_invalid_payload(self, user_client):
+        response = user_client.post(
+            self.post_batch_url, data={'text': 'Пост'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = user_client.post(
+            self.post_batch_url, data=[{'text': 'Пост'}] * 101, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Post.objects.count() == 0
+
+    def test_comment_batch_create(self, user_client, user, post):
+        url = self.comment_batch_url.format(post_id=post.id)
+        user_client.get(f'/api/v1/posts/{post.id}/comments/')
+        response = user_client.post(
+            url, data=[{'text': 'Первый'}, {'text': 'Второй'}], format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        comments = Comment.objects.filter(post=post, author=user)
+        assert comments.count() == 2
+        results = response.json()['results']
+        assert results[1]['data']['post'] == post.id
+        assert len(
+            user_client.get(f'/api/v1/posts/{post.id}/comments/').json()
+        ) == 2, 'Проверьте, что пакетное создание сбрасывает кеш.'
+
+    def test_comment_batch_post_not_found(self, user_client):
+        response = user_client.post(
+            self.comment_batch_url.format(post_id=999),
+            data=[{'text': 'Коммент'}], format='json'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,207 @@
+import multiprocessing
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils.http import http_date
+
+from api.cache import POSTS, _bump
+from posts.models import Comment, Group, Post
+
+
+def bump_in_child():
+    _bump([POSTS])
+
+
+class Clock:
+    """A settable replacement of ``time_ns`` in ``api.cache``."""
+
+    def __init__(self):
+        self.now = 1_700_000_000 * 10 ** 9
+
+    def __call__(self):
+        return self.now
+
+    def tick(self, seconds):
+        self.now += int(seconds * 10 ** 9)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('api.cache.time_ns', clock)
+    return clock
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comment_list_url = '/api/v1/posts/{post_id}/comments/'
+    group_list_url = '/api/v1/groups/'
+
+    def test_repeated_get_served_from_cache(self, client, post,
+                                            django_assert_num_queries):
+        first = client.get(self.post_list_url)
+        assert first.status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            second = client.get(self.post_list_url)
+        assert second.status_code == HTTPStatus.OK
+        assert second.content == first.content, (
+            'Проверьте, что ответ из кеша совпадает с исходным ответом.'
+        )
+
+    def test_write_invalidates_list(self, user_client, post):
+        user_client.get(self.post_list_url)
+        response = user_client.post(
+            self.post_list_url, data={'text': 'Новый пост'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        results = user_client.get(self.post_list_url).json()['results']
+        assert len(results) == Post.objects.count(), (
+            'Проверьте, что после создания поста список постов обновляется.'
+        )
+
+    def test_write_invalidates_detail(self, user_client, post):
+        url = self.post_detail_url.format(post_id=post.id)
+        user_client.get(url)
+        user_client.patch(url, data={'text': 'Изменённый текст'})
+        assert user_client.get(url).json()['text'] == 'Изменённый текст'
+
+    def test_comment_write_keeps_other_keys(self, user_client, post,
+                                            another_post, comment_1_post,
+                                            django_assert_num_queries):
+        user_client.get(self.post_list_url)
+        other_comments_url = self.comment_list_url.format(
+            post_id=another_post.id
+        )
+        user_client.get(other_comments_url)
+        comments_url = self.comment_list_url.format(post_id=post.id)
+        user_client.get(comments_url)
+
+        Comment.objects.create(
+            author=post.author, post=post, text='Новый коммент'
+        )
+
+        assert len(user_client.get(comments_url).json()) == 2, (
+            'Проверьте, что новый комментарий сбрасывает кеш комментариев '
+            'поста.'
+        )
+        with django_assert_num_queries(0):
+            user_client.get(self.post_list_url)
+            user_client.get(other_comments_url)
+
+    def test_group_delete_invalidates_posts(self, client, post, group_1):
+        client.get(self.post_list_url)
+        client.get(self.group_list_url)
+        Group.objects.filter(id=group_1.id).delete()
+
+        assert client.get(self.group_list_url).json() == []
+        results = client.get(self.post_list_url).json()['results']
+        assert results[0]['group'] is None, (
+            'Проверьте, что удаление группы сбрасывает кеш постов.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+    post_list_url = '/api/v1/posts/'
+    comment_list_url = '/api/v1/posts/{post_id}/comments/'
+
+    def test_validators_present(self, clock, client, post):
+        client.get(self.post_list_url)
+        clock.tick(1)
+        response = client.get(self.post_list_url)
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.post_list_url}` '
+            'содержит заголовок `ETag`.'
+        )
+        assert response.has_header('Last-Modified')
+
+    def test_if_none_match_not_modified(self, client, post,
+                                        django_assert_num_queries):
+        url = self.comment_list_url.format(post_id=post.id)
+        etag = client.get(url)['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что запрос с актуальным `If-None-Match` получает '
+            'ответ 304 без обращения к базе данных.'
+        )
+        assert response['ETag'] == etag
+        assert response.content == b''
+
+    def test_if_modified_since_not_modified(self, clock, client, post):
+        client.get(self.post_list_url)
+        clock.tick(1)
+        last_modified = client.get(self.post_list_url)['Last-Modified']
+        response = client.get(
+            self.post_list_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_write_in_same_second_as_fetch(self, clock, client, post):
+        clock.tick(0.1)
+        response = client.get(self.post_list_url)
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что `Last-Modified` не отправляется, пока не '
+            'закончилась секунда последнего изменения.'
+        )
+        clock.tick(0.1)
+        post.text = 'Новый текст'
+        post.save()
+        clock.tick(0.1)
+        response = client.get(
+            self.post_list_url,
+            HTTP_IF_MODIFIED_SINCE=http_date(clock() // 10 ** 9),
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись в ту же секунду, что и чтение, не даёт '
+            'ответа 304 со старыми данными.'
+        )
+        assert 'Новый текст' in response.content.decode()
+
+        clock.tick(1)
+        last_modified = client.get(self.post_list_url)['Last-Modified']
+        clock.tick(0.1)
+        post.text = 'Ещё новее'
+        post.save()
+        response = client.get(
+            self.post_list_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_write_changes_etag(self, client, post, comment_1_post):
+        url = self.comment_list_url.format(post_id=post.id)
+        etag = client.get(url)['ETag']
+        comment_1_post.text = 'Новый текст'
+        comment_1_post.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения данных запрос со старым `ETag` '
+            'получает полный ответ.'
+        )
+        assert response['ETag'] != etag
+
+    def test_invalidation_reaches_other_processes(self, client, post):
+        etag = client.get(self.post_list_url)['ETag']
+        process = multiprocessing.get_context('fork').Process(
+            target=bump_in_child
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что кеш общий для процессов: запись в одном воркере '
+            'должна сбрасывать ответы остальных.'
+        )
+
+    def test_new_user_keeps_cache(self, client, post):
+        etag = client.get(self.post_list_url)['ETag']
+        get_user_model().objects.create_user(username='NewUser')
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что регистрация пользователя не сбрасывает кеш.'
+        )
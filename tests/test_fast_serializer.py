@@ -0,0 +1,86 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+
+from api.fast import CompiledSerializer
+from api.management.commands.bench_serializers import Command
+from api.serializers import (CommentSerializer, GroupSerializer,
+                             PostSearchSerializer, PostSerializer)
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFastListSerializer:
+
+    URLS = [
+        '/api/v1/posts/',
+        '/api/v1/posts/?limit=2&offset=1',
+        '/api/v1/posts/?search=Тестовый',
+        '/api/v1/posts/?stream=1',
+        '/api/v1/posts/{post_id}/comments/',
+        '/api/v1/groups/',
+    ]
+
+    def get_content(self, client, url):
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    @pytest.mark.parametrize('url', URLS)
+    @pytest.mark.usefixtures('post_2', 'another_post', 'group_2',
+                             'comment_1_post', 'comment_2_post')
+    def test_output_is_identical(self, client, settings, post, url):
+        Post.objects.filter(id=post.id).update(
+            image='posts/picture.png',
+            image_variants={'small': 'posts/variants/picture_small.png'},
+        )
+        url = url.format(post_id=post.id)
+
+        settings.API_FAST_LIST_SERIALIZERS = False
+        expected = self.get_content(client, url)
+        settings.API_FAST_LIST_SERIALIZERS = True
+        assert self.get_content(client, url) == expected, (
+            f'Проверьте, что быстрый сериализатор для `{url}` возвращает '
+            'тот же JSON, что и обычный.'
+        )
+
+    @pytest.mark.parametrize('serializer_class', [
+        PostSerializer, PostSearchSerializer, CommentSerializer,
+        GroupSerializer,
+    ])
+    def test_serializers_compile(self, serializer_class):
+        assert CompiledSerializer.compile(serializer_class()) is not None, (
+            f'Проверьте, что `{serializer_class.__name__}` поддерживается '
+            'быстрым сериализатором.'
+        )
+
+    def test_benchmark_command(self, keep_test_database, monkeypatch):
+        live = connection.settings_dict['NAME']
+        databases = []
+        create_rows = Command.create_rows
+
+        def record_database(command, rows):
+            databases.append(connection.settings_dict['NAME'])
+            return create_rows(command, rows)
+
+        monkeypatch.setattr(Command, 'create_rows', record_database)
+        out = StringIO()
+        call_command('bench_serializers', rows=20, repeat=1, stdout=out)
+        results = json.loads(out.getvalue())
+        assert [result['endpoint'] for result in results] == [
+            'posts', 'comments', 'groups'
+        ]
+        assert all(result['rows'] == 20 for result in results)
+        assert databases and live not in databases, (
+            'Проверьте, что бенчмарк создаёт данные во временной базе.'
+        )
+        assert not Post.objects.exists(), (
+            'Проверьте, что бенчмарк не записывает данные в рабочую базу.'
+        )
@@ -0,0 +1,209 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts.models import Follow, PopularAuthor, Post, Timeline
+from posts.timeline import fan_out_post, update_popularity
+
+
+def make_posts(author, count):
+    """Create ``count`` posts a minute apart, the first is the oldest."""
+    now = timezone.now()
+    posts = [
+        Post.objects.create(text=f'Пост {i}', author=author)
+        for i in range(count)
+    ]
+    for i, post in enumerate(posts):
+        post.pub_date = now - timedelta(minutes=count - i)
+    Post.objects.bulk_update(posts, ['pub_date'])
+    return posts
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+    url = '/api/v1/feed/'
+    post_list_url = '/api/v1/posts/'
+    follow_url = '/api/v1/follow/'
+
+    def get_feed_ids(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.url}` возвращает статус 200.'
+        )
+        return [post['id'] for post in response.json()['results']]
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает статус 401.'
+        )
+
+    def test_feed_fan_out_on_create(self, user_client, user, another_user,
+                                    follow_4):
+        response = user_client.post(self.post_list_url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        post = Post.objects.get(id=response.json()['id'])
+        assert post.fanned_out
+        assert Timeline.objects.filter(
+            user=another_user, post=post
+        ).exists(), (
+            'Проверьте, что новый пост добавляется в ленты подписчиков.'
+        )
+        assert not Timeline.objects.filter(user=user).exists()
+
+    def test_feed_backfill_and_trim(self, user_client, user, another_user,
+                                    another_post, post):
+        Post.objects.filter(
+            id__in=(post.id, another_post.id)
+        ).update(fanned_out=True)
+        response = user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert self.get_feed_ids(user_client) == [another_post.id], (
+            'Проверьте, что после подписки в ленте появляются посты автора.'
+        )
+
+        follow = Follow.objects.get(user=user, following=another_user)
+        response = user_client.delete(f'{self.follow_url}{follow.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_feed_ids(user_client) == [], (
+            'Проверьте, что после отписки посты автора исчезают из ленты.'
+        )
+        assert not Timeline.objects.filter(user=user).exists()
+
+    def test_feed_pulls_popular_authors(self, settings, user_client,
+                                        another_user, user, user_2,
+                                        follow_1, follow_3):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 2
+        post = Post.objects.create(text='Популярный пост', author=another_user)
+        fan_out_post(post)
+
+        assert not post.fanned_out
+        assert not Timeline.objects.filter(post=post).exists(), (
+            'Проверьте, что посты популярных авторов не рассылаются по лентам.'
+        )
+        assert self.get_feed_ids(user_client) == [post.id], (
+            'Проверьте, что посты популярных авторов подтягиваются в ленту '
+            'при чтении.'
+        )
+
+    def test_feed_merges_sources_by_cursor(self, settings, user_client, user,
+                                           another_user, user_2, follow_1,
+                                           follow_3):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 2
+        Follow.objects.create(user=user, following=user_2)
+        pulled = make_posts(another_user, 5)
+        pushed = make_posts(user_2, 4)
+        for post in pulled + pushed:
+            fan_out_post(post)
+        assert PopularAuthor.objects.filter(author=another_user).exists()
+        assert not Timeline.objects.filter(post__in=pulled).exists()
+
+        expected = sorted(
+            pulled + pushed, key=lambda post: post.pub_date, reverse=True
+        )
+        ids, url = [], f'{self.url}?page_size=3'
+        while url:
+            page = user_client.get(url).json()
+            ids += [post['id'] for post in page['results']]
+            url = page['next']
+        assert ids == [post.id for post in expected], (
+            'Проверьте, что страницы ленты объединяют рассылку и посты '
+            'популярных авторов без пропусков и повторов.'
+        )
+
+    def test_feed_many_popular_authors(self, settings, user_client, user):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 1
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f'author_{i}') for i in range(1200)
+        )
+        authors = get_user_model().objects.filter(
+            username__startswith='author_'
+        ).order_by('id')
+        Follow.objects.bulk_create(
+            Follow(user=user, following=author) for author in authors
+        )
+        PopularAuthor.objects.bulk_create(
+            PopularAuthor(author=author) for author in authors
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=author,
+                 pub_date=now - timedelta(minutes=i))
+            for i, author in enumerate(authors)
+        )
+        posts = Post.objects.order_by('-pub_date')
+        ids, url = [], f'{self.url}?page_size=100'
+        for _ in range(2):
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что лента подписчика тысяч популярных авторов '
+                'возвращает статус 200.'
+            )
+            ids += [post['id'] for post in response.json()['results']]
+            url = response.json()['next']
+        assert ids == [post.id for post in posts[:200]], (
+            'Проверьте, что лента объединяет посты всех популярных авторов '
+            'без пропусков и повторов.'
+        )
+
+    def test_feed_query_plan(self, settings, user_client, user, another_user,
+                             user_2, follow_1, follow_3):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 2
+        Follow.objects.create(user=user, following=user_2)
+        for post in make_posts(another_user, 3) + make_posts(user_2, 3):
+            fan_out_post(post)
+        cursor = user_client.get(f'{self.url}?page_size=2').json()['next']
+        with CaptureQueriesContext(connection) as context:
+            assert user_client.get(cursor).status_code == HTTPStatus.OK
+        sql = next(
+            query['sql'] for query in context.captured_queries
+            if 'FROM "posts_timeline"' in query['sql']
+        )
+        with connection.cursor() as db:
+            db.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = db.fetchall()
+        details = [row[-1] for row in plan]
+        assert any(
+            'timeline_user_pub_date_idx (user_id=? AND pub_date<?)' in detail
+            for detail in details
+        ), details
+        assert any(
+            'post_author_pub_date_idx (author_id=? AND pub_date<?)' in detail
+            for detail in details
+        ), details
+        for detail in details:
+            assert not detail.startswith('SCAN'), (
+                f'Проверьте, что лента не просматривает таблицы: {details}'
+            )
+        sorts = [row for row in plan if 'TEMP B-TREE' in row[-1]]
+        assert [row[1] for row in sorts] == [0], (
+            'Проверьте, что источники ленты читаются по индексу в порядке '
+            'дат и сортируется только объединённая страница: '
+            f'{details}'
+        )
+
+    def test_feed_author_stops_being_popular(self, settings, user_client,
+                                             another_user, follow_1,
+                                             follow_3):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 2
+        post = Post.objects.create(text='Пост', author=another_user)
+        fan_out_post(post)
+        assert not post.fanned_out
+
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 3
+        assert not update_popularity(another_user)
+        assert not PopularAuthor.objects.exists()
+        assert Post.objects.get(pk=post.pk).fanned_out
+        assert self.get_feed_ids(user_client) == [post.id], (
+            'Проверьте, что посты автора, переставшего быть популярным, '
+            'рассылаются по лентам подписчиков.'
+        )
@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.db import connection
 from django.db.utils import IntegrityError
 import pytest
 
@@ -190,3 +191,38 @@ class TestFollowAPI:
             f'GET-запрос с параметром `search` к `{self.url}` содержит только '
             'те подписки, которые удовлетворяют параметрам поиска.'
         )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_search_by_prefix(self, user_client, user, user_2,
+                                     another_user, follow_1, follow_5):
+        response = user_client.get(f'{self.url}?search=testuser')
+        assert len(response.json()) == 2, (
+            'Проверьте, что поиск по подпискам не зависит от регистра и '
+            'находит пользователей по началу имени.'
+        )
+
+        response = user_client.get(f'{self.url}?search=TestUserA')
+        assert [follow['following'] for follow in response.json()] == [
+            another_user.username
+        ]
+
+        another_user.username = 'Renamed'
+        another_user.save()
+        response = user_client.get(f'{self.url}?search=ren')
+        assert [follow['following'] for follow in response.json()] == [
+            'Renamed'
+        ], (
+            'Проверьте, что поиск учитывает смену имени пользователя.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_follow_search_uses_index(self, user):
+        queryset = Follow.objects.filter(
+            user=user, following_username__gte='a',
+            following_username__lt='b',
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'follow_user_username_idx' in plan, plan
@@ -0,0 +1,116 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from posts.management.commands.generate_dataset import Command
+from posts.models import Comment, Follow, Group, PopularAuthor, Post, Timeline
+
+OPTIONS = {
+    'users': 40, 'groups': 5, 'posts': 300, 'comments': 200,
+    'follows': 120, 'batch_size': 32, 'seed': 7, 'days': 30,
+}
+
+
+def generate(**options):
+    call_command(
+        'generate_dataset', **{**OPTIONS, **options}, stdout=StringIO()
+    )
+
+
+def snapshot():
+    return (
+        list(Post.objects.order_by('pk').values_list(
+            'author__username', 'group__slug', 'text'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'author__username', 'post__text', 'text'
+        )),
+        list(Follow.objects.order_by('pk').values_list(
+            'user__username', 'following__username'
+        )),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateDataset:
+
+    def test_counts(self, django_user_model):
+        generate()
+        assert django_user_model.objects.count() == OPTIONS['users']
+        assert Group.objects.count() == OPTIONS['groups']
+        assert Post.objects.count() == OPTIONS['posts']
+        assert Comment.objects.count() == OPTIONS['comments']
+        assert Follow.objects.exists()
+        assert not Follow.objects.filter(user=F('following')).exists(), (
+            'Проверьте, что пользователи набора не подписаны на себя.'
+        )
+        assert not Follow.objects.exclude(
+            following_username=F('following__username')
+        ).exists(), (
+            'Проверьте, что у подписок заполнено поле `following_username`.'
+        )
+
+    def test_posts_are_fanned_out(self, settings):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 10
+        generate()
+        popular = PopularAuthor.objects.values('author')
+        assert popular.exists()
+        assert not Post.objects.filter(fanned_out=False).exclude(
+            author__in=popular
+        ).exists(), (
+            'Проверьте, что посты набора рассылаются по лентам подписчиков.'
+        )
+        assert Timeline.objects.exists()
+        assert not Timeline.objects.filter(post__author__in=popular).exists()
+
+    def test_distribution_is_skewed(self):
+        generate()
+        counts = sorted(
+            Post.objects.order_by().values('author').annotate(
+                posts=Count('pk')
+            ).values_list('posts', flat=True),
+            reverse=True,
+        )
+        top = sum(counts[:len(counts) // 10 or 1])
+        assert top > OPTIONS['posts'] * 0.3, (
+            'Проверьте, что немногие авторы пишут большую часть постов.'
+        )
+
+    def test_dates_are_spread(self):
+        generate()
+        dates = Post.objects.order_by('pk').values_list('pub_date', flat=True)
+        assert list(dates) == sorted(dates)
+        assert (dates.last() - dates.first()).days >= OPTIONS['days'] - 1, (
+            'Проверьте, что даты публикаций распределены по --days дням.'
+        )
+
+    def test_rerun_is_idempotent(self):
+        generate()
+        before = snapshot()
+        generate()
+        assert snapshot() == before
+
+    def test_interrupted_run_resumes(self, monkeypatch):
+        generate()
+        expected = snapshot()
+        call_command('flush', interactive=False, verbosity=0)
+
+        original = Command.rng
+
+        def interrupt(self, stage, batch):
+            if (stage, batch) == ('posts', 3):
+                raise KeyboardInterrupt
+            return original(self, stage, batch)
+
+        monkeypatch.setattr(Command, 'rng', interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            generate()
+        assert Post.objects.count() == 3 * OPTIONS['batch_size']
+        monkeypatch.setattr(Command, 'rng', original)
+        generate()
+        assert snapshot() == expected, (
+            'Проверьте, что прерванная генерация продолжается с первого '
+            'незавершённого пакета и даёт тот же набор данных.'
+        )
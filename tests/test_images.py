@@ -0,0 +1,106 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from posts import images
+from posts.models import Post
+
+
+def make_image(size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color='red').save(buffer, format='PNG')
+    return SimpleUploadedFile(
+        'picture.png', buffer.getvalue(), content_type='image/png'
+    )
+
+
+def broken_image():
+    return SimpleUploadedFile(
+        'picture.png', b'not an image', content_type='image/png'
+    )
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WORKERS = 0
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageVariants:
+    post_list_url = '/api/v1/posts/'
+    variant_url = '/api/v1/posts/{post_id}/image/{variant}/'
+
+    def test_variants_rendered_after_create(self, user_client, media,
+                                            settings):
+        response = user_client.post(
+            self.post_list_url,
+            data={'text': 'Пост с картинкой', 'image': make_image()},
+            format='multipart',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        post = Post.objects.get(id=response.json()['id'])
+        assert set(post.image_variants) == set(settings.POST_IMAGE_VARIANTS)
+        for variant, size in settings.POST_IMAGE_VARIANTS.items():
+            with Image.open(media / post.image_variants[variant]) as image:
+                assert max(image.size) == size, (
+                    f'Проверьте размер варианта `{variant}` изображения.'
+                )
+
+        test_data = user_client.get(f'{self.post_list_url}{post.id}/').json()
+        assert test_data['image_variants']['small'].endswith(
+            post.image_variants['small']
+        ), 'Проверьте, что пост содержит ссылки на готовые варианты.'
+
+    def test_lazy_variant_on_first_request(self, client, post, media):
+        post.image = make_image()
+        post.save()
+        test_data = client.get(f'{self.post_list_url}{post.id}/').json()
+        url = self.variant_url.format(post_id=post.id, variant='medium')
+        assert test_data['image_variants']['medium'].endswith(url), (
+            'Проверьте, что для неготового варианта отдаётся ссылка на '
+            'его подготовку.'
+        )
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.FOUND
+        post.refresh_from_db()
+        assert response['Location'].endswith(post.image_variants['medium'])
+        assert (media / post.image_variants['medium']).exists()
+
+    def test_variant_not_found(self, client, post, media):
+        url = self.variant_url.format(post_id=post.id, variant='small')
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(
+            f'{self.post_list_url}{post.id}/'
+        ).json()['image_variants'] is None
+
+    def test_broken_image_variant_not_found(self, client, post, media):
+        post.image = broken_image()
+        post.save()
+        url = self.variant_url.format(post_id=post.id, variant='small')
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что изображение, которое не удаётся прочитать, '
+            'даёт статус 404.'
+        )
+
+    def test_worker_failure_logged(self, post, media, settings,
+                                   monkeypatch, caplog):
+        settings.POST_IMAGE_WORKERS = 1
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(images, '_executor', executor)
+        post.image = broken_image()
+        post.save()
+        with caplog.at_level(logging.ERROR, logger='posts.images'):
+            images.schedule_variants(post)
+            executor.shutdown(wait=True)
+        assert any(
+            record.exc_info and str(post.id) in record.getMessage()
+            for record in caplog.records
+        ), 'Проверьте, что ошибка подготовки вариантов попадает в журнал.'
@@ -0,0 +1,98 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.revocation import revoked_tokens
+from posts.models import Follow, Group, Post
+from posts.timeline import backfill_timeline
+
+TABLES = ('posts_post', 'posts_comment', 'posts_follow')
+
+
+def query_plan(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def queryset_plan(queryset):
+    return query_plan(*queryset.query.sql_with_params())
+
+
+def endpoint_plan(client, url, table):
+    """Return the plan of the query that ``url`` sends to ``table``."""
+    revoked_tokens.sync()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if f'FROM "{table}"' in query['sql']
+    ]
+    assert queries, f'Проверьте, что `{url}` читает таблицу {table}.'
+    return query_plan(queries[0])
+
+
+def assert_uses_index(plan, index):
+    assert any(index in detail for detail in plan), (
+        f'Проверьте, что запрос использует индекс {index}: {plan}'
+    )
+    for detail in plan:
+        assert detail not in (f'SCAN {table}' for table in TABLES), (
+            f'Проверьте, что запрос не просматривает таблицу целиком: {plan}'
+        )
+        assert 'TEMP B-TREE FOR ORDER BY' not in detail, (
+            f'Проверьте, что сортировка идёт по индексу: {plan}'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAccessPatternIndexes:
+
+    def test_default_orderings(self):
+        assert Post._meta.ordering == ['-pub_date', '-id']
+        assert Follow._meta.ordering == ['-created', '-id']
+
+    def test_posts_list(self, user_client, dataset):
+        dataset(100)
+        plan = endpoint_plan(user_client, '/api/v1/posts/', 'posts_post')
+        assert_uses_index(plan, 'post_pub_date_id_idx')
+
+    def test_posts_cursor_page(self, user_client, dataset):
+        dataset(100)
+        cursor = user_client.get('/api/v1/posts/').json()['next']
+        assert cursor, 'Проверьте, что список постов разбит на страницы.'
+        plan = endpoint_plan(user_client, cursor, 'posts_post')
+        assert_uses_index(plan, 'post_pub_date_id_idx')
+
+    def test_comments_list(self, user_client, dataset):
+        post = dataset(100)
+        plan = endpoint_plan(
+            user_client, f'/api/v1/posts/{post.id}/comments/',
+            'posts_comment',
+        )
+        assert_uses_index(plan, 'comment_post_created_idx')
+
+    def test_follow_list(self, user_client, dataset):
+        dataset(100)
+        plan = endpoint_plan(user_client, '/api/v1/follow/', 'posts_follow')
+        assert_uses_index(plan, 'follow_user_created_idx')
+
+    def test_author_posts(self, user, user_2, dataset):
+        dataset(100)
+        with CaptureQueriesContext(connection) as context:
+            backfill_timeline(user, user_2)
+        assert_uses_index(
+            query_plan(context.captured_queries[0]['sql']),
+            'post_author_pub_date_idx',
+        )
+
+    def test_group_posts(self, dataset):
+        dataset(100)
+        group = Group.objects.earliest('id')
+        assert_uses_index(
+            queryset_plan(Post.objects.filter(group=group)),
+            'post_group_pub_date_idx',
+        )
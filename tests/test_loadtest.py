@@ -0,0 +1,113 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.benchmarks import scratch_database
+from api.throttling import BucketRateThrottle
+
+from api.management.commands.loadtest import (DEFAULT_MIX, OPERATIONS,
+                                              Command, DjangoClientTransport,
+                                              parse_login, parse_mix)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLoadTest:
+
+    @pytest.fixture(autouse=True)
+    def fast_logins(self, settings, monkeypatch):
+        settings.PASSWORD_HASHERS = [
+            'django.contrib.auth.hashers.MD5PasswordHasher'
+        ]
+        monkeypatch.setattr(BucketRateThrottle, 'THROTTLE_RATES', {
+            'login': None, 'read': None, 'write': None,
+        })
+
+    def run(self, **options):
+        # Общая база в памяти не ждёт блокировок, как файл с busy_timeout,
+        # поэтому клиент один.
+        options = {
+            'url': None, 'requests': 80, 'concurrency': 1,
+            'mix': parse_mix(DEFAULT_MIX), 'users': 3, 'posts': 20,
+            'seed': 0, **options,
+        }
+        return Command().run(DjangoClientTransport, options)
+
+    def test_report_covers_mix(self):
+        report = self.run()
+        assert report['requests'] == 80
+        assert set(report['endpoints']) <= set(OPERATIONS)
+        for name, endpoint in report['endpoints'].items():
+            assert endpoint['errors'] == 0, (
+                f'Проверьте, что операция `{name}` выполняется без ошибок: '
+                f'{endpoint["statuses"]}'
+            )
+            assert endpoint['p50_ms'] <= endpoint['p95_ms'] <= (
+                endpoint['p99_ms']
+            )
+            assert endpoint['queries_per_request'] is not None
+
+    def test_mix_restricts_operations(self):
+        report = self.run(mix=parse_mix('post_list=1'))
+        assert list(report['endpoints']) == ['post_list']
+
+    def test_server_mode_writes_no_users(self, user, post, post_2):
+        report = self.run(
+            url='http://testserver', logins=[(user.username, '1234567')],
+            mix=parse_mix('post_list=1,post_detail=1,jwt_create=1'),
+            requests=20,
+        )
+        for name, endpoint in report['endpoints'].items():
+            assert endpoint['errors'] == 0, (
+                f'Проверьте, что операция `{name}` выполняется без ошибок: '
+                f'{endpoint["statuses"]}'
+            )
+        assert list(
+            get_user_model().objects.values_list('username', flat=True)
+        ) == [user.username], (
+            'Проверьте, что с --url команда не создаёт пользователей в базе.'
+        )
+
+    def test_server_mode_requires_login(self):
+        with pytest.raises(CommandError):
+            call_command('loadtest', url='http://127.0.0.1:1')
+
+
+class TestScratchDatabase:
+
+    def test_outputs_stay_in_scratch(self, settings, client, metrics_dir,
+                                     slow_query_log, keep_test_database):
+        settings.API_SLOW_QUERY_THRESHOLD = 0
+        shared_cache = settings.CACHES['default']['LOCATION']
+        with scratch_database():
+            assert client.get('/api/v1/posts/').status_code == 200
+            assert client.get('/metrics').status_code == 200
+        assert not list(metrics_dir.glob('*')), (
+            'Проверьте, что метрики нагрузочного теста не попадают в '
+            'API_METRICS_DIR сервиса.'
+        )
+        assert not slow_query_log.exists(), (
+            'Проверьте, что запросы нагрузочного теста не пишутся в журнал '
+            'медленных запросов сервиса.'
+        )
+        assert not list(shared_cache.glob('*')), (
+            'Проверьте, что нагрузочный тест не записывает ответы в общий '
+            'кеш сервиса.'
+        )
+        assert settings.CACHES['default']['LOCATION'] == shared_cache
+
+
+class TestParseMix:
+
+    def test_login_parsed(self):
+        assert parse_login('user:pa:ss') == ('user', 'pa:ss')
+        with pytest.raises(CommandError):
+            parse_login('user')
+
+    def test_unknown_operation_rejected(self):
+        with pytest.raises(CommandError):
+            parse_mix('post_list=1,unknown=2')
+
+    def test_malformed_mix_rejected(self):
+        with pytest.raises(CommandError):
+            parse_mix('post_list')
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import multiprocessing
+import re
+from http import HTTPStatus
+
+import pytest
+
+from api.metrics import MmapValues, registry
+
+LIST_LABELS = 'view="PostViewSet",action="list"'
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain')
+    return response.content.decode()
+
+
+def sample(text, name, labels):
+    match = re.search(
+        rf'^{name}{{{re.escape(labels)}}} (\S+)$', text, re.MULTILINE
+    )
+    assert match, f'Проверьте, что `/metrics` содержит {name}{{{labels}}}.'
+    return float(match.group(1))
+
+
+def record_in_child():
+    registry.inc('api_requests_total', (('view', 'Child'),), 5)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetrics:
+    url = '/api/v1/posts/'
+
+    def test_requests_labelled_by_view_and_action(self, client, user_client,
+                                                  post):
+        client.get(self.url)
+        client.get(self.url)
+        user_client.post(
+            f'{self.url}{post.id}/comments/', data={'text': 'Комментарий'}
+        )
+        text = scrape(client)
+        assert sample(
+            text, 'api_requests_total',
+            f'{LIST_LABELS},method="GET",status="200"'
+        ) == 2
+        assert sample(
+            text, 'api_requests_total',
+            'view="CommentViewSet",action="create",method="POST",'
+            'status="201"'
+        ) == 1
+        assert '# TYPE api_request_duration_seconds histogram' in text
+
+    def test_histograms_are_cumulative(self, client, post):
+        for _ in range(3):
+            client.get(self.url)
+        text = scrape(client)
+        buckets = [
+            float(value) for value in re.findall(
+                rf'^api_request_duration_seconds_bucket'
+                rf'{{{LIST_LABELS},le="[^"]+"}} (\S+)$',
+                text, re.MULTILINE,
+            )
+        ]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == sample(
+            text, 'api_request_duration_seconds_count', LIST_LABELS
+        ) == 3
+        assert sample(
+            text, 'api_response_size_bytes_count', LIST_LABELS
+        ) == 3
+
+    def test_db_queries_counted(self, client, post):
+        client.get(self.url)
+        text = scrape(client)
+        assert sample(text, 'api_db_queries_total', LIST_LABELS) >= 1
+        assert sample(text, 'api_db_duration_seconds_total', LIST_LABELS) > 0
+
+    def test_db_queries_counted_under_asgi(self, client, async_client,
+                                           settings, post):
+        settings.ROOT_URLCONF = settings.API_ASYNC_URLCONF
+        response = asyncio.run(async_client.get(f'{self.url}{post.id}/'))
+        assert response.status_code == HTTPStatus.OK
+        text = scrape(client)
+        assert sample(
+            text, 'api_db_queries_total',
+            'view="PostViewSet",action="retrieve"'
+        ) >= 1, (
+            'Проверьте, что запросы к базе из пула потоков асинхронных '
+            'представлений учитываются.'
+        )
+
+    def test_metrics_view_not_measured(self, client):
+        scrape(client)
+        assert 'api_requests_total' not in scrape(client)
+
+    def test_processes_are_aggregated(self, client):
+        registry.inc('api_requests_total', (('view', 'Child'),), 1)
+        process = multiprocessing.get_context('fork').Process(
+            target=record_in_child
+        )
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert sample(
+            scrape(client), 'api_requests_total', 'view="Child"'
+        ) == 6, 'Проверьте, что метрики всех процессов суммируются.'
+
+
+class TestMmapValues:
+
+    def test_file_grows_and_reopens(self, tmp_path):
+        path = tmp_path / 'values.metrics'
+        values = MmapValues(path)
+        keys = [json.dumps(['metric', [['key', str(i)]]]) for i in range(3000)]
+        for key in keys:
+            values.add(values.position(key), 1)
+        values.add(values.position(keys[0]), 1.5)
+        values.close()
+        assert path.stat().st_size > MmapValues.initial_size
+        reopened = MmapValues(path)
+        assert len(reopened.positions) == len(keys)
+        reopened.add(reopened.position(keys[0]), 1)
+        assert MmapValues.value.unpack_from(
+            reopened.map, reopened.positions[keys[0]]
+        )[0] == 3.5
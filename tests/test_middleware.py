@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from django.http import HttpResponse
+
+from api.metrics import MetricsMiddleware
+from api.profiling import ProfilingMiddleware
+from api.replicas import ReplicaMiddleware
+
+MIDDLEWARE = [MetricsMiddleware, ProfilingMiddleware, ReplicaMiddleware]
+
+
+def get_response(request):
+    return HttpResponse()
+
+
+async def aget_response(request):
+    return HttpResponse()
+
+
+class TestAsyncCapableMiddleware:
+
+    @pytest.mark.parametrize('middleware', MIDDLEWARE)
+    def test_sync_chain(self, middleware):
+        instance = middleware(get_response)
+        assert not asyncio.iscoroutinefunction(instance)
+        assert not asyncio.iscoroutinefunction(instance.process_view)
+
+    @pytest.mark.parametrize('middleware', MIDDLEWARE)
+    def test_async_chain(self, middleware):
+        instance = middleware(aget_response)
+        assert asyncio.iscoroutinefunction(instance), (
+            f'Проверьте, что под ASGI {middleware.__name__} вызывается как '
+            'корутина, без переключения потока.'
+        )
+        assert asyncio.iscoroutinefunction(instance.process_view), (
+            f'Проверьте, что под ASGI {middleware.__name__} подставляет '
+            'асинхронный process_view.'
+        )
@@ -66,18 +66,19 @@ class TestPostAPI:
         )
 
         test_data = response.json()
-        assert isinstance(test_data, list), (
+        assert isinstance(test_data, dict) and 'results' in test_data, (
             'Проверьте, что GET-запрос авторизованного пользователя к '
-            f'`{self.post_list_url}` возвращает список.'
+            f'`{self.post_list_url}` без параметров возвращает страницу '
+            'курсорной пагинации с полем `results`.'
         )
 
-        assert len(test_data) == Post.objects.count(), (
+        assert len(test_data['results']) == Post.objects.count(), (
             'Проверьте, что GET-запрос авторизованного пользователя к '
             f'`{self.post_list_url}` возвращает список всех постов.'
         )
 
-        db_post = Post.objects.first()
-        test_post = test_data[0]
+        db_post = Post.objects.order_by('-pub_date', '-id').first()
+        test_post = test_data['results'][0]
         self.check_post_data(
             test_post,
             f'GET-запрос к `{self.post_list_url}`',
@@ -127,6 +128,46 @@ class TestPostAPI:
             db_post=db_post
         )
 
+    def test_posts_get_cursor_paginated(self, user_client, user):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user) for i in range(5)
+        )
+        expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+        response = user_client.get(f'{self.post_list_url}?page_size=2')
+        assert response.status_code == HTTPStatus.OK
+        test_data = response.json()
+        assert set(test_data) == {'next', 'previous', 'results'}, (
+            'Проверьте, что ответ курсорной пагинации содержит поля '
+            '`next`, `previous` и `results`.'
+        )
+        assert test_data['previous'] is None
+        received_ids = [post['id'] for post in test_data['results']]
+
+        pages = [test_data]
+        while test_data['next']:
+            test_data = user_client.get(test_data['next']).json()
+            pages.append(test_data)
+            received_ids += [post['id'] for post in test_data['results']]
+        assert received_ids == expected_ids, (
+            'Проверьте, что переход по ссылкам `next` возвращает все посты '
+            'по убыванию `pub_date` без пропусков и повторов.'
+        )
+
+        previous_page = user_client.get(pages[-1]['previous']).json()
+        assert previous_page['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_posts_get_invalid_cursor(self, user_client, post):
+        response = user_client.get(f'{self.post_list_url}?cursor=invalid')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает статус 404.'
+        )
+
     def test_post_create_auth_with_invalid_data(self, user_client):
         posts_count = Post.objects.count()
         response = user_client.post(self.post_list_url, data={})
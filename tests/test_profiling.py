@@ -0,0 +1,78 @@
+import asyncio
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.profiling import ProfileRing, make_profile_token
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.API_PROFILE_DIR = tmp_path / 'profiles'
+    return settings.API_PROFILE_DIR
+
+
+@pytest.mark.django_db(transaction=True)
+class TestProfiling:
+    url = '/api/v1/posts/'
+
+    def test_not_profiled_by_default(self, client, post, profile_dir):
+        assert client.get(self.url).status_code == HTTPStatus.OK
+        assert ProfileRing().names() == [], (
+            'Проверьте, что при нулевой доле запросы не профилируются.'
+        )
+
+    def test_sampled_requests_profiled(self, client, settings, post,
+                                       comment_1_post, profile_dir):
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        assert client.get(self.url).status_code == HTTPStatus.OK
+        assert client.get(
+            f'{self.url}{post.id}/comments/'
+        ).status_code == HTTPStatus.OK
+        assert ProfileRing().names() == [
+            'CommentViewSet.list', 'PostViewSet.list'
+        ], 'Проверьте, что профили сохраняются по имени представления.'
+
+    def test_signed_header(self, client, post, profile_dir):
+        client.get(self.url, HTTP_X_PROFILE='profile:forged')
+        assert ProfileRing().names() == [], (
+            'Проверьте, что заголовок с неверной подписью игнорируется.'
+        )
+        response = client.get(self.url, HTTP_X_PROFILE=make_profile_token())
+        assert response.status_code == HTTPStatus.OK
+        assert len(ProfileRing().samples('PostViewSet.list')) == 1
+
+    def test_ring_is_bounded(self, client, settings, post, profile_dir):
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        settings.API_PROFILE_RING_SIZE = 2
+        for _ in range(4):
+            client.get(self.url)
+        assert len(ProfileRing().samples('PostViewSet.list')) == 2, (
+            'Проверьте, что хранятся только последние профили представления.'
+        )
+
+    def test_async_reads_profiled(self, async_client, settings, post,
+                                  profile_dir):
+        settings.ROOT_URLCONF = settings.API_ASYNC_URLCONF
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        response = asyncio.run(async_client.get(f'{self.url}{post.id}/'))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['id'] == post.id
+        stats = ProfileRing().merge('PostViewSet.retrieve')
+        functions = {name for _, _, name in stats.stats} if stats else ()
+        assert 'to_representation' in functions, (
+            'Проверьте, что под ASGI профиль охватывает работу '
+            'представления.'
+        )
+
+    def test_report(self, client, settings, post, profile_dir):
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        client.get(self.url)
+        client.get(self.url)
+        output = StringIO()
+        call_command('profile_report', '--limit', '5', stdout=output)
+        report = output.getvalue()
+        assert 'PostViewSet.list: запросов 2' in report
+        assert 'function calls' in report
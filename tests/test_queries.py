@@ -0,0 +1,45 @@
+import pytest
+
+from api.revocation import revoked_tokens
+from posts.models import Group
+from tests.fixtures.fixture_dataset import DATASET_SIZES
+
+# Максимальное число SQL-запросов на эндпоинт, не зависящее от объёма данных.
+# Один запрос из бюджета авторизованного клиента уходит на загрузку
+# пользователя из JWT-токена. Фильтр отозванных токенов загружается один раз
+# на процесс и в бюджет не входит. Лента сначала выбирает популярных
+# авторов из подписок, чтобы ограничить выборку их постов по каждому.
+QUERY_BUDGETS = [
+    ('/api/v1/posts/', 2),
+    ('/api/v1/posts/?limit=10&offset=5', 3),
+    ('/api/v1/posts/{post_id}/', 2),
+    ('/api/v1/posts/{post_id}/comments/', 2),
+    ('/api/v1/posts/{post_id}/comments/{comment_id}/', 2),
+    ('/api/v1/follow/', 2),
+    ('/api/v1/follow/?search=author_1', 2),
+    ('/api/v1/groups/', 2),
+    ('/api/v1/groups/{group_id}/', 2),
+    ('/api/v1/feed/', 3),
+]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('size', DATASET_SIZES)
+    @pytest.mark.parametrize('url, budget', QUERY_BUDGETS)
+    def test_read_endpoints_query_budget(self, user_client, dataset,
+                                         django_assert_max_num_queries,
+                                         size, url, budget):
+        post = dataset(size)
+        url = url.format(
+            post_id=post.id,
+            comment_id=post.comments.earliest('id').id,
+            group_id=Group.objects.earliest('id').id,
+        )
+        revoked_tokens.sync()
+        with django_assert_max_num_queries(budget):
+            response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.replicas import PIN_COOKIE
+from posts.models import Post
+from posts.timeline import fan_out_post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReadReplica:
+    url = '/api/v1/posts/'
+
+    def test_safe_requests_read_replica(self, client, user, replica):
+        Post.objects.create(author=user, text='Реплицирован')
+        replica()
+        Post.objects.create(author=user, text='Ещё не реплицирован')
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        texts = [post['text'] for post in response.json()['results']]
+        assert texts == ['Реплицирован'], (
+            'Проверьте, что GET-запросы к публикациям читают из реплики.'
+        )
+
+    def test_write_pins_client_to_primary(self, user_client, user, replica,
+                                          settings):
+        replica()
+        response = user_client.post(self.url, data={'text': 'Новый пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        cookie = response.cookies[PIN_COOKIE]
+        assert cookie['max-age'] == settings.DATABASE_REPLICA_LAG
+        response = user_client.get(self.url)
+        assert [post['text'] for post in response.json()['results']] == [
+            'Новый пост'
+        ], 'Проверьте, что после записи клиент читает из основной базы.'
+
+    def test_write_pins_user_without_cookies(self, user_client, user,
+                                             replica):
+        replica()
+        response = user_client.post(self.url, data={'text': 'Новый пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        user_client.cookies.clear()
+        response = user_client.get(self.url)
+        assert [post['text'] for post in response.json()['results']] == [
+            'Новый пост'
+        ], (
+            'Проверьте, что после записи пользователь читает из основной '
+            'базы и без cookie.'
+        )
+
+    def test_requests_without_writes_not_pinned(self, client, user_client,
+                                                user, replica):
+        replica()
+        response = user_client.post(self.url, data={})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert PIN_COOKIE not in response.cookies, (
+            'Проверьте, что неудачная запись не закрепляет клиента за '
+            'основной базой.'
+        )
+        response = client.post('/api/v1/jwt/create/', data={
+            'username': user.username, 'password': '1234567',
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert PIN_COOKIE not in response.cookies
+        Post.objects.create(author=user, text='Ещё не реплицирован')
+        user_client.cookies.clear()
+        assert user_client.get(self.url).json()['results'] == []
+
+    def test_other_clients_not_pinned(self, user_client, client, user,
+                                      replica):
+        replica()
+        user_client.post(self.url, data={'text': 'Новый пост'})
+        response = client.get(self.url)
+        assert response.json()['results'] == []
+
+    def test_views_without_flag_read_primary(self, user_client, user,
+                                             another_user, replica):
+        replica()
+        post = Post.objects.create(author=another_user, text='Пост')
+        fan_out_post(post)
+        user_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        user_client.cookies.clear()
+        response = user_client.get('/api/v1/feed/')
+        assert [item['id'] for item in response.json()['results']] == [
+            post.id
+        ]
+
+    def test_unsafe_requests_write_primary(self, user_client, replica):
+        replica()
+        response = user_client.post(self.url, data={'text': 'Новый пост'})
+        assert Post.objects.filter(pk=response.json()['id']).exists()
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.bloom import BloomFilter
+from api.models import RevokedToken
+from api.revocation import revoked_tokens
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTokenRevocation:
+    url = '/api/v1/follow/'
+    revoke_url = '/api/v1/jwt/revoke/'
+    refresh_url = '/api/v1/jwt/refresh/'
+    verify_url = '/api/v1/jwt/verify/'
+
+    def test_revoked_access_token_rejected(self, client, user_client, token):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        response = client.post(
+            self.revoke_url, data={'token': token['access']}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что POST-запрос к `/api/v1/jwt/revoke/` с валидным '
+            'токеном возвращает статус 200.'
+        )
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что отозванный access-токен не принимается.'
+        response = client.post(
+            self.verify_url, data={'token': token['access']}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_revoked_refresh_token_rejected(self, client, token):
+        client.post(self.revoke_url, data={'token': token['refresh']})
+        response = client.post(
+            self.refresh_url, data={'refresh': token['refresh']}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отозванный refresh-токен нельзя обменять на '
+            'новый access-токен.'
+        )
+
+    def test_invalid_token_not_revoked(self, client):
+        response = client.post(self.revoke_url, data={'token': 'invalid'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert not RevokedToken.objects.exists()
+
+    def test_bloom_miss_skips_database(self, user_client, another_user,
+                                       client, django_assert_num_queries):
+        other_access = RefreshToken.for_user(another_user).access_token
+        client.post(self.revoke_url, data={'token': str(other_access)})
+        user_client.get(self.url)
+        # Остаётся только запрос подписок: токен отсеян фильтром Блума.
+        with django_assert_num_queries(1):
+            response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_revocation_from_other_process_seen(self, user_client, token,
+                                                monkeypatch, settings):
+        now = [1000.0]
+        monkeypatch.setattr('api.revocation.monotonic', lambda: now[0])
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        # Запись, добавленная другим процессом в обход фильтра.
+        RevokedToken.objects.create(
+            jti=AccessToken(token['access'])['jti'],
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        now[0] += settings.API_REVOCATION_REFRESH + 1
+        assert user_client.get(self.url).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что фильтр подтягивает токены, отозванные в других '
+            'процессах.'
+        )
+
+    def test_compact_removes_expired(self):
+        now = timezone.now()
+        RevokedToken.objects.create(
+            jti='expired', expires_at=now - timedelta(seconds=1)
+        )
+        RevokedToken.objects.create(
+            jti='active', expires_at=now + timedelta(minutes=5)
+        )
+        out = StringIO()
+        call_command('compact_revoked_tokens', stdout=out)
+        assert list(
+            RevokedToken.objects.values_list('jti', flat=True)
+        ) == ['active']
+        assert '1' in out.getvalue()
+        assert revoked_tokens.is_revoked('active')
+        assert not revoked_tokens.is_revoked('expired')
+
+
+class TestBloomFilter:
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
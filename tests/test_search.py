@@ -0,0 +1,95 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from posts.models import Post
+from posts.search import FTS_TABLE
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+    url = '/api/v1/posts/?search={query}'
+
+    def search(self, client, query):
+        response = client.get(self.url.format(query=query))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос с параметром `search` к '
+            '`/api/v1/posts/` возвращает статус 200.'
+        )
+        return response.json()
+
+    def test_search_ranked(self, client, user):
+        weak = Post.objects.create(
+            text='Рецепт пирога и немного про погоду', author=user
+        )
+        strong = Post.objects.create(text='Пирога пирога пирога', author=user)
+        Post.objects.create(text='Совсем другой текст', author=user)
+
+        test_data = self.search(client, 'пирога')
+        assert test_data['count'] == 2
+        ids = [post['id'] for post in test_data['results']]
+        assert ids == [strong.id, weak.id], (
+            'Проверьте, что результаты поиска отсортированы по релевантности.'
+        )
+        assert '<b>пирога</b>' in test_data['results'][1]['snippet'].lower()
+        assert 'rank' in test_data['results'][0]
+
+    def test_search_snippet_escapes_text(self, client, user):
+        Post.objects.create(
+            text='<script>alert(1)</script> пирога & <i>чай</i>', author=user
+        )
+        snippet = self.search(client, 'пирога')['results'][0]['snippet']
+        assert '<script>' not in snippet and '<i>' not in snippet, (
+            'Проверьте, что текст поста в сниппете экранирован.'
+        )
+        assert '&lt;script&gt;' in snippet
+        assert '<b>пирога</b>' in snippet
+        assert '&amp;' in snippet
+
+    def test_search_index_follows_updates(self, user_client, post):
+        assert self.search(user_client, 'Изменённый')['count'] == 0
+        user_client.patch(
+            f'/api/v1/posts/{post.id}/', data={'text': 'Изменённый текст'}
+        )
+        assert self.search(user_client, 'Изменённый')['count'] == 1, (
+            'Проверьте, что изменение поста обновляет поисковый индекс.'
+        )
+        user_client.delete(f'/api/v1/posts/{post.id}/')
+        assert self.search(user_client, 'Изменённый')['count'] == 0, (
+            'Проверьте, что удаление поста убирает его из поискового индекса.'
+        )
+
+    def test_search_syntax_is_escaped(self, client, post):
+        test_data = self.search(client, 'пост" OR NEAR(*')
+        assert test_data['count'] == 0
+
+    def test_rebuild_index_command(self, client, post, post_2):
+        out = StringIO()
+        call_command('rebuild_post_index', batch_size=1, stdout=out)
+        assert 'постов: 2' in out.getvalue()
+        assert self.search(client, 'Тестовый')['count'] == 2
+
+    def test_rebuild_skips_posts_created_during_rebuild(self, client, user,
+                                                        post, post_2):
+        created = []
+
+        class Progress(StringIO):
+            def write(self, message):
+                if not created:
+                    created.append(Post.objects.create(
+                        text='Черновик рецепта', author=user
+                    ))
+                return super().write(message)
+
+        call_command('rebuild_post_index', batch_size=1, stdout=Progress())
+        assert self.search(client, 'Черновик')['count'] == 1
+        with connection.cursor() as cursor:
+            # Проверка сверяет индекс с таблицей постов: повторная запись
+            # того же поста даёт ошибку.
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) "
+                "VALUES ('integrity-check', 1)"
+            )
@@ -0,0 +1,81 @@
+import asyncio
+import re
+from http import HTTPStatus
+
+import pytest
+
+PHASES = ('auth', 'perm', 'db', 'serialize', 'render', 'total')
+
+
+def parse(header):
+    """Return ``{phase: (milliseconds, description)}`` of the header."""
+    result = {}
+    for metric in header.split(', '):
+        match = re.fullmatch(
+            r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', metric
+        )
+        assert match, f'Некорректная метрика Server-Timing: {metric}'
+        result[match[1]] = (float(match[2]), match[3])
+    return result
+
+
+@pytest.fixture
+def server_timing(settings):
+    settings.API_SERVER_TIMING = True
+
+
+@pytest.mark.django_db(transaction=True)
+class TestServerTiming:
+    url = '/api/v1/posts/'
+
+    def test_disabled_by_default(self, client, post):
+        response = client.get(self.url)
+        assert 'Server-Timing' not in response
+
+    def test_phases(self, user_client, post, comment_1_post, server_timing):
+        for url in (self.url, f'{self.url}{post.id}/',
+                    f'{self.url}{post.id}/comments/', '/api/v1/follow/'):
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert 'Server-Timing' in response, (
+                f'Проверьте, что ответ `{url}` содержит Server-Timing.'
+            )
+            phases = parse(response['Server-Timing'])
+            assert tuple(phases) == PHASES
+            assert phases['total'][0] >= sum(
+                phases[phase][0] for phase in PHASES[:-1]
+            ) - 0.1, 'Проверьте, что фазы запроса не пересекаются.'
+            assert phases['db'][1].endswith(' queries')
+
+    def test_phases_are_measured(self, user_client, post, server_timing):
+        phases = parse(
+            user_client.get(f'{self.url}{post.id}/')['Server-Timing']
+        )
+        for phase in ('auth', 'db', 'serialize', 'render'):
+            assert phases[phase][0] > 0, (
+                f'Проверьте, что фаза `{phase}` измеряется.'
+            )
+        assert int(phases['db'][1].split()[0]) >= 1
+
+    def test_errors_and_writes(self, client, user_client, post,
+                               server_timing):
+        response = client.post(self.url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert 'Server-Timing' in response
+        response = user_client.post(self.url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'Server-Timing' in response
+
+    def test_token_views(self, client, user, server_timing):
+        response = client.post('/api/v1/jwt/create/', data={
+            'username': user.username, 'password': '1234567',
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' in response
+
+    def test_under_asgi(self, async_client, settings, post, server_timing):
+        settings.ROOT_URLCONF = settings.API_ASYNC_URLCONF
+        response = asyncio.run(async_client.get(f'{self.url}{post.id}/'))
+        assert response.status_code == HTTPStatus.OK
+        phases = parse(response['Server-Timing'])
+        assert phases['db'][0] > 0 and phases['render'][0] > 0
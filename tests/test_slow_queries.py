@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.slowlog import fingerprint, read_log
+from posts.models import Comment, Post
+
+
+@pytest.fixture
+def log_everything(settings):
+    settings.API_SLOW_QUERY_THRESHOLD = 0
+
+
+def entries(settings):
+    return list(read_log(settings.API_SLOW_QUERY_LOG))
+
+
+class TestFingerprint:
+
+    def test_parameters_do_not_matter(self):
+        first = fingerprint(
+            'SELECT * FROM "posts_post" WHERE "id" IN (%s, %s) LIMIT 20'
+        )
+        second = fingerprint(
+            "SELECT * FROM  \"posts_post\" WHERE \"id\" IN (%s) LIMIT 5"
+        )
+        assert first == second
+        assert first[1] == (
+            'SELECT * FROM "posts_post" WHERE "id" IN (...) LIMIT ?'
+        )
+
+    def test_literals_normalized(self):
+        assert fingerprint("SELECT 'a''b', 1.5")[1] == 'SELECT ?, ?'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSlowQueryLog:
+
+    def test_fast_queries_not_logged(self, settings, client, post):
+        settings.API_SLOW_QUERY_THRESHOLD = 60
+        client.get('/api/v1/posts/')
+        assert entries(settings) == []
+
+    def test_view_and_plan_recorded(self, settings, client, post,
+                                    log_everything):
+        client.get('/api/v1/posts/')
+        client.get('/api/v1/posts/')
+        logged = [
+            entry for entry in entries(settings)
+            if entry['view'] == 'PostViewSet.list'
+        ]
+        assert logged, (
+            'Проверьте, что в журнал попадает представление, выполнившее '
+            'запрос.'
+        )
+        by_fingerprint = {}
+        for entry in logged:
+            by_fingerprint.setdefault(entry['fingerprint'], []).append(entry)
+        for same in by_fingerprint.values():
+            assert sum('plan' in entry for entry in same) == 1, (
+                'Проверьте, что EXPLAIN выполняется один раз на отпечаток.'
+            )
+
+    def test_full_scans_flagged(self, settings, post, comment_1_post,
+                                log_everything):
+        list(Post.objects.filter(text='Нет такого текста'))
+        list(Comment.objects.filter(
+            post__in=Post.objects.filter(text__contains='x')
+        ))
+        list(Post.objects.filter(pk=post.pk))
+        list(Post.objects.all()[:5])
+        scans = [entry['full_scans'] for entry in entries(settings)]
+        assert scans[0] == ['posts_post']
+        # Комментарии ищутся по индексу post_id, подзапрос - под U0.
+        assert scans[1] == ['posts_post'], (
+            'Проверьте, что просмотр таблицы под псевдонимом тоже отмечается.'
+        )
+        assert scans[2] == []
+        assert scans[3] == [], (
+            'Проверьте, что обход по индексу с LIMIT не считается полным '
+            'просмотром таблицы.'
+        )
+
+    def test_log_rotates(self, settings, post, log_everything):
+        settings.API_SLOW_QUERY_LOG_SIZE = 2000
+        for _ in range(40):
+            list(Post.objects.filter(text='Нет такого текста'))
+        assert settings.API_SLOW_QUERY_LOG.with_name(
+            'slow_queries.log.1'
+        ).exists()
+        assert len(entries(settings)) > 1
+
+    def test_report(self, settings, client, post, log_everything):
+        list(Post.objects.filter(text='Нет такого текста'))
+        client.get('/api/v1/posts/')
+        output = StringIO()
+        call_command('slow_queries', '--full-scans', stdout=output)
+        report = output.getvalue()
+        assert 'FULL SCAN: posts_post' in report
+        assert 'plan: SCAN posts_post' in report
+        output = StringIO()
+        call_command('slow_queries', '--sort', 'count', stdout=output)
+        assert 'PostViewSet.list' in output.getvalue()
@@ -0,0 +1,23 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+class TestSQLiteProfile:
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_production_pragmas_applied(self, settings):
+        assert settings.SQLITE_PROFILE == 'production'
+        assert self.pragma('busy_timeout') == 5000, (
+            'Проверьте, что на новом соединении выставляется busy_timeout.'
+        )
+        # 1 соответствует synchronous=NORMAL.
+        assert self.pragma('synchronous') == 1
+        assert self.pragma('cache_size') == -64 * 1024
+
+    def test_persistent_connections(self, settings):
+        assert settings.DATABASES['default']['CONN_MAX_AGE'] > 0
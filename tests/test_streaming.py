@@ -0,0 +1,42 @@
+import json
+
+import pytest
+from django.http import StreamingHttpResponse
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStreamingList:
+    comment_list_url = '/api/v1/posts/{post_id}/comments/'
+
+    def test_stream_matches_regular_response(self, user_client, post,
+                                             comment_1_post, comment_2_post):
+        url = self.comment_list_url.format(post_id=post.id)
+        regular = user_client.get(url)
+        streamed = user_client.get(f'{url}?stream=1')
+
+        assert isinstance(streamed, StreamingHttpResponse), (
+            'Проверьте, что `?stream=1` возвращает потоковый ответ.'
+        )
+        assert streamed['Content-Type'] == regular['Content-Type']
+        assert b''.join(streamed.streaming_content) == regular.content, (
+            'Проверьте, что потоковый ответ совпадает с обычным JSON.'
+        )
+
+    def test_stream_posts_bypasses_pagination(self, client, user):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user) for i in range(25)
+        )
+        response = client.get('/api/v1/posts/?stream=1')
+        test_data = json.loads(b''.join(response.streaming_content))
+        assert [post['id'] for post in test_data] == list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        ), 'Проверьте, что поток постов содержит все посты, новые первыми.'
+
+    def test_stream_empty(self, client, post):
+        Comment.objects.all().delete()
+        url = self.comment_list_url.format(post_id=post.id)
+        response = client.get(f'{url}?stream=true')
+        assert b''.join(response.streaming_content) == b'[]'
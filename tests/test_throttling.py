@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.throttling import BucketRateThrottle, bucket_store
+
+RATES = {'login': '2/min', 'write': '2/min', 'read': '3/min'}
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    monkeypatch.setattr(BucketRateThrottle, 'THROTTLE_RATES', RATES)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestThrottling:
+    url = '/api/v1/groups/'
+    create_url = '/api/v1/jwt/create/'
+
+    def test_read_scope_limited(self, rates, client, group_1):
+        for _ in range(3):
+            assert client.get(self.url).status_code == HTTPStatus.OK
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что при превышении лимита чтения возвращается '
+            'статус 429.'
+        )
+        assert int(response['Retry-After']) > 0
+
+    def test_scopes_counted_separately(self, rates, user_client, group_1,
+                                       another_user):
+        for _ in range(2):
+            user_client.post(
+                '/api/v1/follow/', data={'following': another_user.username}
+            )
+        for _ in range(3):
+            assert user_client.get(self.url).status_code == HTTPStatus.OK, (
+                'Проверьте, что запросы на запись не расходуют лимит чтения.'
+            )
+
+    def test_users_limited_separately(self, rates, client, user_client,
+                                      group_1):
+        for _ in range(3):
+            user_client.get(self.url)
+        assert client.get(self.url).status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит авторизованного пользователя не '
+            'распространяется на анонимных клиентов.'
+        )
+
+    def test_login_limited(self, rates, client, user):
+        data = {'username': user.username, 'password': '1234567'}
+        for _ in range(2):
+            response = client.post(self.create_url, data=data)
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(self.create_url, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что число попыток получить токен ограничено.'
+        )
+
+    def test_login_forwarded_for_ignored(self, rates, client, user):
+        data = {'username': user.username, 'password': 'wrong'}
+        statuses = [
+            client.post(
+                self.create_url, data=data,
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}',
+            ).status_code
+            for i in range(10)
+        ]
+        assert HTTPStatus.TOO_MANY_REQUESTS in statuses, (
+            'Проверьте, что подмена X-Forwarded-For не обходит ограничение '
+            'попыток получить токен.'
+        )
+
+
+class TestBucketStore:
+
+    def test_bucket_refills(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr('api.throttling.time', lambda: now[0])
+        assert bucket_store.consume('key', 2, 60) == (True, 1)
+        assert bucket_store.consume('key', 2, 60) == (True, 0)
+        assert bucket_store.consume('key', 2, 60)[0] is False
+        now[0] += 30
+        assert bucket_store.consume('key', 2, 60) == (True, 0)
+
+    def test_purge_drops_idle_buckets(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr('api.throttling.time', lambda: now[0])
+        bucket_store.consume('key', 1, 60)
+        bucket_store.purge(before=1001.0)
+        assert bucket_store.consume('key', 1, 60) == (True, 0)
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .metrics import install_query_tracking
+        from .slowlog import install_slow_query_log
+        connection_created.connect(install_query_tracking)
+        connection_created.connect(install_slow_query_log)
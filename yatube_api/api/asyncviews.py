@@ -0,0 +1,185 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial, wraps
+from http import HTTPStatus
+from itertools import islice
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+from django.http import HttpResponse, JsonResponse
+from django.urls import URLPattern, URLResolver
+from rest_framework.permissions import SAFE_METHODS
+
+_executor = None
+_executor_lock = Lock()
+_slots = WeakKeyDictionary()
+
+
+def get_executor():
+    """Return the thread pool running the ORM work of async reads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.API_ASYNC_WORKERS,
+                thread_name_prefix='api-read',
+            )
+    return _executor
+
+
+def get_slots():
+    """Return the semaphore limiting async reads in the running loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _slots:
+        _slots[loop] = asyncio.Semaphore(settings.API_ASYNC_MAX_CONCURRENCY)
+    return _slots[loop]
+
+
+def detach(response):
+    """
+    Return a rendered response as a plain ``HttpResponse``.
+
+    Django 3.2 renders responses that have a ``render`` method on its single
+    thread-sensitive executor even when they are rendered already. Streamed
+    bodies are left lazy and read by ``AsyncReadASGIHandler``.
+    """
+    if response.streaming or not hasattr(response, 'render'):
+        return response
+    response.render()
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    plain.cookies = response.cookies
+    return plain
+
+
+def call_view(view, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        return detach(view(request, *args, **kwargs))
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Wrap a DRF view so that safe requests run in the read executor.
+
+    At most ``API_ASYNC_MAX_CONCURRENCY`` requests per process wait for or
+    use the ``API_ASYNC_WORKERS`` threads; requests over the limit get 503
+    at once instead of queueing without bound. Other methods are run the
+    way Django runs synchronous views.
+    """
+    sync_view = sync_to_async(view)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return await sync_view(request, *args, **kwargs)
+        slots = get_slots()
+        if slots.locked():
+            response = JsonResponse(
+                {'detail': 'Сервер перегружен, повторите запрос позже.'},
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+            response['Retry-After'] = '1'
+            return response
+        async with slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                get_executor(),
+                copy_context().run,
+                partial(call_view, view, request, *args, **kwargs),
+            )
+    return wrapper
+
+
+def with_async_reads(patterns):
+    """
+    Return a copy of ``patterns`` with async views where supported.
+
+    Views of viewsets that set ``async_reads`` are wrapped with
+    ``async_read_view``; everything else is kept as is.
+    """
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                with_async_reads(pattern.url_patterns),
+                pattern.default_kwargs,
+                pattern.app_name,
+                pattern.namespace,
+            )
+        elif getattr(getattr(pattern.callback, 'cls', None),
+                     'async_reads', False):
+            pattern = URLPattern(
+                pattern.pattern,
+                async_read_view(pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+        result.append(pattern)
+    return result
+
+
+async def read_in_thread(parts, batch_size):
+    """
+    Yield ``parts`` joined in batches read on Django's sync thread.
+
+    The iterator of a streamed body may query the database, which is not
+    allowed in the event loop. Every batch is taken on the same
+    thread-sensitive thread, where the iterator's cursor stays valid, and
+    at most ``batch_size`` parts are held in memory.
+    """
+    take = sync_to_async(
+        lambda: b''.join(islice(parts, batch_size)), thread_sensitive=True
+    )
+    while True:
+        body = await take()
+        if not body:
+            return
+        yield body
+
+
+class AsyncReadASGIHandler(ASGIHandler):
+    """
+    ASGI handler resolving requests against ``API_ASYNC_URLCONF``.
+
+    Streamed bodies are read off the event loop by ``read_in_thread``;
+    Django 3.2 would iterate them inside the loop.
+    """
+
+    stream_batch_size = 100
+
+    async def get_response_async(self, request):
+        request.urlconf = settings.API_ASYNC_URLCONF
+        return await super().get_response_async(request)
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        parts = iter(response.streaming_content)
+        response.streaming_content = ()
+
+        async def send_body_first(message):
+            # Тело отправляется перед завершающим пустым сообщением.
+            if message['type'] == 'http.response.body' and not message.get(
+                'more_body'
+            ):
+                async for body in read_in_thread(
+                    parts, self.stream_batch_size
+                ):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': body,
+                        'more_body': True,
+                    })
+            await send(message)
+
+        await super().send_response(response, send_body_first)
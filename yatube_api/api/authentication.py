@@ -0,0 +1,74 @@
+import copy
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import get_generations, user_generation
+from .lru import ExpiringLRUCache
+from .replicas import route_user
+from .revocation import revoked_tokens
+from .tokens import REVOKED_MESSAGE, cached_token, remember_payload
+
+user_cache = ExpiringLRUCache(settings.API_AUTH_USER_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps resolved users in a per-process LRU.
+
+    Users are cached by the token's user id claim for
+    ``API_AUTH_USER_CACHE_TTL`` seconds, which saves a query on every
+    authenticated request. Each entry keeps the user's generation from the
+    host-shared cache and is reloaded when it changes, so saving or
+    deleting a user takes effect in all worker processes on the next
+    request.
+
+    Verified tokens are memoized by their hash until they expire, so a
+    token presented again is neither base64-decoded nor checked against its
+    signature.
+
+    Revoked tokens are rejected whether they come from the cache or not.
+
+    The authenticated user is passed to the replica routing, so that reads
+    after the user's own writes go to the primary.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            route_user(result[0])
+        return result
+
+    def get_validated_token(self, raw_token):
+        token = cached_token(raw_token, api_settings.AUTH_TOKEN_CLASSES)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            remember_payload(raw_token, token.payload)
+        if revoked_tokens.is_revoked(token[api_settings.JTI_CLAIM]):
+            raise InvalidToken(REVOKED_MESSAGE)
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.payload.get(api_settings.USER_ID_CLAIM)
+        # Поколение читается до базы: изменение после чтения пользователя
+        # увеличит его, и следующий запрос загрузит пользователя заново.
+        [generation] = get_generations([user_generation(user_id)])
+        cached = user_cache.get(user_id)
+        if cached is not None and cached[0] == generation:
+            user = cached[1]
+        else:
+            # Ошибки (нет пользователя, неактивен) не кешируются.
+            user = super().get_user(validated_token)
+            user_cache.set(
+                user_id, (generation, user),
+                settings.API_AUTH_USER_CACHE_TTL,
+            )
+        # Копия, чтобы изменения request.user не попали в общий кеш.
+        return copy.copy(user)
+
+
+def evict_user(user):
+    """Drop the cached copy of ``user`` in the current process."""
+    user_cache.pop(getattr(user, api_settings.USER_ID_FIELD))
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+def bulk_create_with_ids(model, objects):
+    """
+    Insert ``objects`` with one ``bulk_create`` and set their primary keys.
+
+    SQLite does not return primary keys from a bulk insert in Django 3.2.
+    Writers are serialized and ``AUTOINCREMENT`` keys are consecutive
+    within one transaction, so the keys are restored from the largest id.
+    Must be called inside a transaction.
+    """
+    model.objects.bulk_create(objects)
+    if objects and objects[0].pk is None:
+        if connection.vendor != 'sqlite':
+            raise NotImplementedError(
+                'Backend does not return primary keys from bulk_create.'
+            )
+        last_id = model.objects.aggregate(last_id=Max('pk'))['last_id']
+        first_id = last_id - len(objects) + 1
+        for offset, obj in enumerate(objects):
+            obj.pk = first_id + offset
+    return objects
+
+
+class BatchCreateMixin:
+    """
+    Create many objects in a single request and a single transaction.
+
+    Items are validated one by one with the list serializer's child, valid
+    ones are inserted with ``bulk_create`` and every item gets a result with
+    its index: either the created object or its validation errors.
+    """
+
+    batch_max_size = settings.API_BATCH_MAX_SIZE
+
+    def get_batch_instance(self, validated_data):
+        """Return an unsaved model instance for one valid item."""
+        raise NotImplementedError(
+            'Define get_batch_instance() in the viewset.'
+        )
+
+    def perform_batch_create(self, objects):
+        """Insert the objects; extend to run post-create side effects."""
+        bulk_create_with_ids(self.get_queryset().model, objects)
+
+    def validate_batch(self, items):
+        """
+        Validate every item of the batch separately.
+
+        Returns:
+            tuple: ``(validated, errors)`` dicts keyed by item index.
+        """
+        if not isinstance(items, list):
+            raise ValidationError(
+                {'non_field_errors': ['Ожидается список объектов.']}
+            )
+        if not 0 < len(items) <= self.batch_max_size:
+            raise ValidationError({'non_field_errors': [
+                f'Количество объектов должно быть от 1 до '
+                f'{self.batch_max_size}.'
+            ]})
+
+        serializer = self.get_serializer(data=items, many=True)
+        validated, errors = {}, {}
+        for index, item in enumerate(items):
+            try:
+                validated[index] = serializer.child.run_validation(item)
+            except ValidationError as exc:
+                errors[index] = exc.detail
+        return validated, errors
+
+    def get_batch_result(self, index, objects, errors):
+        if index in objects:
+            return {
+                'index': index,
+                'status': status.HTTP_201_CREATED,
+                'data': self.get_serializer(objects[index]).data,
+            }
+        return {
+            'index': index,
+            'status': status.HTTP_400_BAD_REQUEST,
+            'errors': errors[index],
+        }
+
+    def batch_create(self, request):
+        validated, errors = self.validate_batch(request.data)
+        objects = {
+            index: self.get_batch_instance(data)
+            for index, data in validated.items()
+        }
+        if objects:
+            with transaction.atomic():
+                self.perform_batch_create(list(objects.values()))
+
+        results = [
+            self.get_batch_result(index, objects, errors)
+            for index in range(len(request.data))
+        ]
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif not objects:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'results': results}, status=response_status)
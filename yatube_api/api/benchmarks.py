@@ -0,0 +1,48 @@
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import override_settings
+
+from posts.sqlite import use_database
+
+
+def percentile(values, fraction):
+    """Return the ``fraction`` percentile of ``values`` (nearest rank)."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+@contextmanager
+def scratch_database():
+    """
+    Run the block against a freshly migrated temporary SQLite file.
+
+    Metrics, the response cache, profiles and the slow query log are kept
+    in the same temporary directory, so that synthetic requests never reach
+    the files shared with the running service.
+    """
+    original = connections['default'].settings_dict['NAME']
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            # override_settings заново создаёт объекты кеша: на изменение
+            # CACHES откликается обработчик из django.test.signals.
+            with override_settings(
+                API_METRICS_DIR=directory / 'metrics',
+                API_PROFILE_DIR=directory / 'profiles',
+                API_SLOW_QUERY_LOG=directory / 'slow_queries.log',
+                CACHES={'default': {
+                    **settings.CACHES['default'],
+                    'LOCATION': directory / 'cache',
+                }},
+            ):
+                use_database(str(directory / 'scratch.sqlite3'))
+                call_command('migrate', verbosity=0)
+                yield
+                connections.close_all()
+    finally:
+        use_database(original)
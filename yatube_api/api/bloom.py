@@ -0,0 +1,36 @@
+from hashlib import sha256
+from math import ceil, log
+
+
+class BloomFilter:
+    """
+    Probabilistic set of strings without false negatives.
+
+    Sized for ``capacity`` items at the given false positive rate; items
+    cannot be removed.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = ceil(-capacity * log(error_rate) / log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = sha256(item.encode()).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:16], 'big') | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
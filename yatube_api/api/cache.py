@@ -0,0 +1,164 @@
+from functools import partial
+from hashlib import md5
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .replicas import used_replica
+
+GENERATION_PREFIX = 'api:gen:'
+RESPONSE_PREFIX = 'api:response:'
+
+POSTS = 'posts'
+GROUPS = 'groups'
+USERS = 'users'
+
+
+def post_generation(post_id):
+    """Return the generation name of a single post."""
+    return f'post:{post_id}'
+
+
+def comments_generation(post_id):
+    """Return the generation name of the comments of a post."""
+    return f'comments:{post_id}'
+
+
+def user_generation(user_id):
+    """Return the generation name of a single user."""
+    return f'user:{user_id}'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_generations(names):
+    """
+    Return the current value of every generation in ``names``.
+
+    Missing generations are started from the current time so that a value
+    evicted from the cache never reuses a number seen before.
+    """
+    cache = get_cache()
+    keys = [GENERATION_PREFIX + name for name in names]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(*names):
+    """
+    Invalidate every cached response that depends on ``names``.
+
+    The bump runs after the surrounding transaction commits, so a response
+    rendered from uncommitted data can never be stored under the new
+    generation.
+    """
+    transaction.on_commit(partial(_bump, names))
+
+
+def _bump(names):
+    # Поколение хранит время изменения в наносекундах: оно уникально и
+    # служит значением заголовка Last-Modified.
+    get_cache().set_many(
+        {GENERATION_PREFIX + name: time_ns() for name in names},
+        timeout=None,
+    )
+
+
+def _store_response(key, response):
+    # Реплика может отставать от основной базы, поэтому ответ, собранный из
+    # неё, хранится не дольше допустимого отставания.
+    if used_replica():
+        timeout = settings.DATABASE_REPLICA_LAG
+    else:
+        timeout = settings.API_RESPONSE_CACHE_TIMEOUT
+    get_cache().set(
+        key, (response.content, response['Content-Type']), timeout
+    )
+
+
+class CachedResponseMixin:
+    """
+    Serve rendered JSON of ``list`` and ``retrieve`` from the cache.
+
+    The cache key contains the generations returned by
+    ``get_cache_generations``. Signals bump these generations on every
+    write, so stale entries are never read again and simply expire.
+
+    The same key is sent to clients as a strong ``ETag`` and the newest
+    generation as ``Last-Modified``, so conditional requests are answered
+    with 304 without touching the database. ``Last-Modified`` has a
+    resolution of one second, so it is neither sent nor compared with
+    ``If-Modified-Since`` until the second of the newest generation is
+    over: a later write in the same second would not change it.
+    """
+
+    def get_cache_generations(self):
+        """Return generation names the current response depends on."""
+        raise NotImplementedError(
+            'Define get_cache_generations() in the viewset.'
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_version(self, request):
+        """
+        Return ``(digest, last_modified)`` of the current representation.
+
+        ``last_modified`` is a Unix timestamp in seconds.
+        """
+        generations = get_generations(self.get_cache_generations())
+        raw = '|'.join(
+            [request.build_absolute_uri(), request.accepted_media_type]
+            + [str(generation) for generation in generations]
+        )
+        digest = md5(raw.encode()).hexdigest()
+        return digest, max(generations) // 10 ** 9
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        # Браузерная версия API зависит от пользователя, её не кешируем.
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        digest, last_modified = self.get_response_version(request)
+        if last_modified >= time_ns() // 10 ** 9:
+            last_modified = None
+        etag = quote_etag(digest)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = RESPONSE_PREFIX + digest
+            cached = get_cache().get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                # Потоковые ответы не собираются в памяти и не кешируются.
+                if not response.streaming:
+                    response.add_post_render_callback(
+                        partial(_store_response, key)
+                    )
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
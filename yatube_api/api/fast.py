@@ -0,0 +1,165 @@
+from django.conf import settings
+from rest_framework import fields, relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .timing import measure
+
+# Поля, значение которых из values() уже совпадает с выводом DRF.
+IDENTITY_FIELDS = (
+    fields.IntegerField,
+    fields.CharField,
+    fields.FloatField,
+    relations.PrimaryKeyRelatedField,
+    relations.SlugRelatedField,
+)
+
+
+def identity(value):
+    return value
+
+
+def datetime_converter(field):
+    """Return a converter equal to ``DateTimeField.to_representation``."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    if (output_format is None or output_format.lower() != fields.ISO_8601
+            or field_timezone is None):
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def file_converter(field, storage):
+    """Return a converter equal to ``FileField.to_representation``."""
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return identity
+    request = field.context.get('request')
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+    return convert
+
+
+class CompiledSerializer:
+    """
+    Read-only list serializer working on ``values()`` rows.
+
+    The fields of a ``ModelSerializer`` are compiled once into
+    ``(name, lookup, converter)`` columns. Rows are fetched with
+    ``QuerySet.values()`` and turned into dicts without building model
+    instances or walking DRF fields, and the result renders to the same
+    JSON as ``serializer.data``.
+
+    ``SerializerMethodField`` is supported when the serializer declares the
+    needed lookups in ``row_method_fields`` and a ``get_<name>_from_row``
+    method.
+    """
+
+    def __init__(self, columns, lookups):
+        self.columns = columns
+        self.lookups = list(dict.fromkeys(lookups))
+
+    @classmethod
+    def compile(cls, serializer):
+        """
+        Return a compiled serializer or ``None`` if a field is unsupported.
+
+        Each column is ``(name, lookup, converter)``; ``lookup`` is ``None``
+        for method fields, whose converter receives the whole row.
+        """
+        model = serializer.Meta.model
+        row_method_fields = getattr(serializer, 'row_method_fields', {})
+        columns, lookups = [], []
+        for field in serializer._readable_fields:
+            name = field.field_name
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in row_method_fields:
+                    return None
+                columns.append(
+                    (name, None, getattr(serializer, f'get_{name}_from_row'))
+                )
+                lookups.extend(row_method_fields[name])
+                continue
+            if field.source == '*':
+                return None
+            lookup = field.source.replace('.', '__')
+            if isinstance(field, relations.SlugRelatedField):
+                lookup = f'{lookup}__{field.slug_field}'
+                converter = identity
+            elif isinstance(field, IDENTITY_FIELDS):
+                converter = identity
+            elif isinstance(field, fields.DateTimeField):
+                converter = datetime_converter(field)
+            elif isinstance(field, fields.FileField):
+                storage = model._meta.get_field(field.source).storage
+                converter = file_converter(field, storage)
+            else:
+                return None
+            columns.append((name, lookup, converter))
+            lookups.append(lookup)
+        return cls(columns, lookups)
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def to_representation(self, row):
+        ret = {}
+        for name, lookup, converter in self.columns:
+            if lookup is None:
+                ret[name] = converter(row)
+                continue
+            value = row[lookup]
+            ret[name] = None if value is None else converter(value)
+        return ret
+
+    def represent_many(self, rows):
+        with measure('serialize'):
+            return [self.to_representation(row) for row in rows]
+
+
+class FastListMixin:
+    """
+    Serve JSON ``list`` responses through ``CompiledSerializer``.
+
+    Falls back to the regular serializer for other formats, for
+    serializers that cannot be compiled and when
+    ``API_FAST_LIST_SERIALIZERS`` is off. Must precede
+    ``StreamingListMixin`` so that streamed rows use the same path.
+    """
+
+    def get_compiled_serializer(self):
+        if (not settings.API_FAST_LIST_SERIALIZERS
+                or self.request.accepted_renderer.format != 'json'):
+            return None
+        return CompiledSerializer.compile(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        if compiled is None or self.is_streaming():
+            return super().list(request, *args, **kwargs)
+
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.represent_many(page))
+        return Response(compiled.represent_many(queryset))
+
+    def iter_representations(self, queryset):
+        compiled = self.get_compiled_serializer()
+        if compiled is None:
+            yield from super().iter_representations(queryset)
+            return
+        rows = compiled.values(queryset).iterator(
+            chunk_size=self.stream_chunk_size
+        )
+        for row in rows:
+            yield compiled.to_representation(row)
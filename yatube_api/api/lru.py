@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class ExpiringLRUCache:
+    """
+    Thread-safe in-process LRU cache with per-entry expiry.
+
+    Holds at most ``maxsize`` entries; adding one more evicts the least
+    recently used entry. Expired entries are dropped when they are read.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        """Store ``value`` for ``timeout`` seconds."""
+        if timeout <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
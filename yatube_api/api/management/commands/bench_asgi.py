@@ -0,0 +1,225 @@
+import asyncio
+import io
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+from api.asyncviews import AsyncReadASGIHandler
+from api.benchmarks import percentile, scratch_database
+from api.throttling import BucketRateThrottle
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+HOST = 'localhost'
+
+
+def wsgi_get(application, path):
+    """Run a GET request through a WSGI application, return the status."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST,
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split()[0]))
+
+    result = application(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        result.close()
+    return statuses[0]
+
+
+async def asgi_get(application, path):
+    """Run a GET request through an ASGI application, return the status."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', HOST.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+    statuses = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    modes = {
+        'wsgi': WSGIHandler,
+        'asgi-plain': ASGIHandler,
+        'asgi': AsyncReadASGIHandler,
+    }
+    help = (
+        'Сравнивает пропускную способность чтения через WSGI, стандартный '
+        'обработчик ASGI и ASGI с асинхронными представлениями чтения при '
+        'заданном числе одновременных клиентов. Все варианты работают с '
+        'одной временной базой внутри процесса, без сетевого сервера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[100, 1000],
+            help='Числа одновременных клиентов.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Количество запросов на каждый замер.',
+        )
+        parser.add_argument(
+            '--rows', type=int, default=2000,
+            help='Количество постов в базе.',
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.API_ASYNC_WORKERS,
+            help='Потоки WSGI-сервера и исполнителя ASGI.',
+        )
+
+    def handle(self, *args, **options):
+        if (options['requests'] <= 0 or options['rows'] <= 0
+                or options['threads'] <= 0
+                or min(options['concurrency']) <= 0):
+            raise CommandError('Все параметры должны быть положительными.')
+
+        original_settings = (
+            settings.API_RESPONSE_CACHE_TIMEOUT,
+            settings.API_ASYNC_WORKERS,
+            BucketRateThrottle.THROTTLE_RATES,
+        )
+        # Замеряется работа с базой: ответы не кешируются, чтение не
+        # ограничивается.
+        settings.API_RESPONSE_CACHE_TIMEOUT = 0
+        settings.API_ASYNC_WORKERS = options['threads']
+        BucketRateThrottle.THROTTLE_RATES = {
+            **BucketRateThrottle.THROTTLE_RATES, 'read': None,
+        }
+        try:
+            with scratch_database():
+                paths = self.prepare(options['rows'])
+                results = [
+                    self.measure(mode, concurrency, paths, options)
+                    for concurrency in options['concurrency']
+                    for mode in self.modes
+                ]
+        finally:
+            (settings.API_RESPONSE_CACHE_TIMEOUT,
+             settings.API_ASYNC_WORKERS,
+             BucketRateThrottle.THROTTLE_RATES) = original_settings
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def prepare(self, rows):
+        """Fill the scratch database and return the paths to request."""
+        author = User.objects.create(username='bench_author')
+        Group.objects.bulk_create(
+            Group(title=f'Группа {i}', slug=f'group-{i}',
+                  description='Описание')
+            for i in range(10)
+        )
+        Post.objects.bulk_create(
+            (Post(author=author, text=f'Пост {i}') for i in range(rows)),
+            batch_size=BATCH_SIZE,
+        )
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        Comment.objects.bulk_create(
+            (Comment(author=author, post_id=post_id, text='Комментарий')
+             for post_id in post_ids for _ in range(3)),
+            batch_size=BATCH_SIZE,
+        )
+        rng = random.Random(0)
+        sample = rng.sample(post_ids, min(len(post_ids), 100))
+        return (
+            ['/api/v1/posts/', '/api/v1/groups/',
+             f'/api/v1/groups/{Group.objects.earliest("id").pk}/']
+            + [f'/api/v1/posts/{pk}/' for pk in sample]
+            + [f'/api/v1/posts/{pk}/comments/' for pk in sample]
+        )
+
+    def measure(self, mode, concurrency, paths, options):
+        latencies, errors, elapsed = asyncio.run(
+            self.run_clients(mode, concurrency, paths, options)
+        )
+        return {
+            'server': mode,
+            'concurrency': concurrency,
+            'requests': len(latencies),
+            'requests_per_second': round(len(latencies) / elapsed),
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'errors': errors,
+        }
+
+    async def run_clients(self, mode, concurrency, paths, options):
+        application = self.modes[mode]()
+        if mode == 'wsgi':
+            # Модель потокового WSGI-сервера: лишние соединения ждут потока.
+            pool = ThreadPoolExecutor(max_workers=options['threads'])
+            loop = asyncio.get_running_loop()
+
+            def get(path):
+                return loop.run_in_executor(
+                    pool, wsgi_get, application, path
+                )
+        else:
+            pool = None
+
+            def get(path):
+                return asgi_get(application, path)
+
+        remaining = [options['requests']]
+        latencies, errors = [], [0]
+        rng = random.Random(concurrency)
+
+        async def client():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started = perf_counter()
+                status = await get(rng.choice(paths))
+                latencies.append(perf_counter() - started)
+                if status != 200:
+                    errors[0] += 1
+
+        started = perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = perf_counter() - started
+        if pool is not None:
+            pool.shutdown()
+        return latencies, errors[0], elapsed
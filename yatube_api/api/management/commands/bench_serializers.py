@@ -0,0 +1,117 @@
+import json
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.benchmarks import scratch_database
+from api.fast import CompiledSerializer
+from api.serializers import (CommentSerializer, GroupSerializer,
+                             PostSerializer)
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость сериализации списков DRF и быстрого '
+        'сериализатора. Данные создаются во временной базе, рабочая база '
+        'не блокируется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=10_000,
+            help='Количество постов, комментариев и групп.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Число повторов, берётся лучший результат.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] <= 0 or options['repeat'] <= 0:
+            raise CommandError('--rows и --repeat должны быть положительными.')
+        with scratch_database():
+            post = self.create_rows(options['rows'])
+            results = [
+                self.measure(name, serializer_class, queryset,
+                             options['repeat'])
+                for name, serializer_class, queryset in (
+                    ('posts', PostSerializer,
+                     Post.objects.select_related('author')),
+                    ('comments', CommentSerializer,
+                     Comment.objects.filter(post=post)
+                     .select_related('author')),
+                    ('groups', GroupSerializer, Group.objects.all()),
+                )
+            ]
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def create_rows(self, rows):
+        author = User.objects.create(username='bench_author')
+        Group.objects.bulk_create(
+            (Group(title=f'Группа {i}', slug=f'bench-{i}')
+             for i in range(rows)),
+            batch_size=BATCH_SIZE,
+        )
+        Post.objects.bulk_create(
+            (Post(text=f'Пост {i} ' * 10, author=author)
+             for i in range(rows)),
+            batch_size=BATCH_SIZE,
+        )
+        post = Post.objects.filter(author=author).earliest('id')
+        Comment.objects.bulk_create(
+            (Comment(text=f'Коммент {i}', author=author, post=post)
+             for i in range(rows)),
+            batch_size=BATCH_SIZE,
+        )
+        return post
+
+    def measure(self, name, serializer_class, queryset, repeat):
+        request = Request(APIRequestFactory().get('/api/v1/'))
+        context = {'request': request}
+        renderer = JSONRenderer()
+        compiled = CompiledSerializer.compile(
+            serializer_class(context=context)
+        )
+
+        def regular():
+            return renderer.render(
+                serializer_class(queryset.all(), many=True,
+                                 context=context).data
+            )
+
+        def fast():
+            return renderer.render(
+                compiled.represent_many(compiled.values(queryset.all()))
+            )
+
+        regular_time, expected = self.best_of(regular, repeat)
+        fast_time, content = self.best_of(fast, repeat)
+        if content != expected:
+            raise CommandError(f'{name}: вывод сериализаторов отличается.')
+        rows = queryset.count()
+        return {
+            'endpoint': name,
+            'rows': rows,
+            'drf_rows_per_second': round(rows / regular_time),
+            'compiled_rows_per_second': round(rows / fast_time),
+            'speedup': round(regular_time / fast_time, 2),
+        }
+
+    @staticmethod
+    def best_of(func, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = perf_counter()
+            result = func()
+            elapsed = perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.revocation import revoked_tokens
+
+
+class Command(BaseCommand):
+    help = 'Удаляет из списка отозванных токенов записи с истёкшим сроком.'
+
+    def handle(self, *args, **options):
+        deleted = revoked_tokens.compact()
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших токенов: {deleted}')
+        )
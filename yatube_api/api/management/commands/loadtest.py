@@ -0,0 +1,393 @@
+import json
+import random
+import threading
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from api.benchmarks import percentile, scratch_database
+from api.throttling import BucketRateThrottle
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+USERNAME_PREFIX = 'loadtest_'
+PASSWORD = 'loadtest-password'
+
+# Операции нагрузки: (метод, шаблон пути, ожидаемые статусы).
+OPERATIONS = {
+    'post_list': ('GET', '/api/v1/posts/', {200}),
+    'post_detail': ('GET', '/api/v1/posts/{post}/', {200}),
+    'comment_list': ('GET', '/api/v1/posts/{post}/comments/', {200}),
+    'comment_create': ('POST', '/api/v1/posts/{post}/comments/', {201}),
+    'follow_list': ('GET', '/api/v1/follow/', {200}),
+    # Повторная подписка на того же автора отклоняется с 400.
+    'follow_create': ('POST', '/api/v1/follow/', {201, 400}),
+    'jwt_create': ('POST', '/api/v1/jwt/create/', {200}),
+    'jwt_refresh': ('POST', '/api/v1/jwt/refresh/', {200}),
+}
+DEFAULT_MIX = (
+    'post_list=30,post_detail=20,comment_list=15,comment_create=10,'
+    'follow_list=10,follow_create=5,jwt_create=5,jwt_refresh=5'
+)
+
+
+def parse_mix(value):
+    """Parse ``name=weight,...`` into a dict of operation weights."""
+    try:
+        mix = {
+            name: int(weight)
+            for name, weight in (item.split('=') for item in value.split(','))
+        }
+    except ValueError:
+        raise CommandError('--mix задаётся в виде name=weight,...')
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise CommandError(f'Неизвестные операции: {", ".join(unknown)}')
+    if sum(mix.values()) <= 0:
+        raise CommandError('Сумма весов в --mix должна быть положительной.')
+    return mix
+
+
+def parse_login(value):
+    """Parse ``username:password`` into a tuple."""
+    username, separator, password = value.partition(':')
+    if not (username and separator and password):
+        raise CommandError('--login задаётся в виде username:password')
+    return username, password
+
+
+class DjangoClientTransport:
+    """Send requests through the Django test client in this process."""
+
+    def __init__(self):
+        # Хост testserver разрешён только под тестовым раннером.
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if '*' not in host),
+            'localhost',
+        )
+        self.client = Client(HTTP_HOST=host)
+
+    def request(self, method, path, data, token):
+        headers = {}
+        if token:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            if method == 'GET':
+                response = self.client.get(path, **headers)
+            else:
+                response = self.client.post(
+                    path, json.dumps(data), content_type='application/json',
+                    **headers
+                )
+        return response.status_code, response.content, queries[0]
+
+
+class HTTPTransport:
+    """Send requests to a running server."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data, token):
+        body = None if method == 'GET' else json.dumps(data).encode()
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method,
+            headers={'Content-Type': 'application/json'},
+        )
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, response.read(), None
+        except urllib.error.HTTPError as error:
+            return error.code, error.read(), None
+
+
+class VirtualUser:
+    """A client that logs in once and then replays the operation mix."""
+
+    def __init__(self, transport, credentials, users, post_ids, rng):
+        self.transport = transport
+        self.username, self.password = credentials
+        self.users = users
+        self.post_ids = post_ids
+        self.rng = rng
+        self.tokens = {}
+
+    def login(self):
+        status, content, _ = self.transport.request(
+            'POST', OPERATIONS['jwt_create'][1],
+            {'username': self.username, 'password': self.password}, None,
+        )
+        if status != 200:
+            raise CommandError(
+                f'Не удалось получить токен для {self.username}: {status}'
+            )
+        self.tokens = json.loads(content)
+
+    def prepare(self, name):
+        """Return ``(method, path, data, token)`` of operation ``name``."""
+        method, template, _ = OPERATIONS[name]
+        path = template.format(post=self.rng.choice(self.post_ids))
+        data = {}
+        if name == 'comment_create':
+            data = {'text': 'Комментарий нагрузочного теста'}
+        elif name == 'follow_create':
+            data = {'following': self.rng.choice(self.users)}
+        elif name == 'jwt_create':
+            data = {'username': self.username, 'password': self.password}
+        elif name == 'jwt_refresh':
+            data = {'refresh': self.tokens['refresh']}
+        return method, path, data, self.tokens['access']
+
+    def run(self, name):
+        method, path, data, token = self.prepare(name)
+        started = perf_counter()
+        status, content, queries = self.transport.request(
+            method, path, data, token
+        )
+        elapsed = perf_counter() - started
+        if name == 'jwt_refresh' and status == 200:
+            self.tokens['access'] = json.loads(content)['access']
+        return status, elapsed, queries
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест API: смесь запросов к публикациям, комментариям, '
+        'подпискам и JWT с заданными весами. Выводит перцентили задержки, '
+        'RPS, число SQL-запросов и ошибки по каждой операции в JSON. По '
+        'умолчанию работает через тестовый клиент на временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера, например http://127.0.0.1:8000. '
+                 'Команда ничего не записывает в базу: учётные записи '
+                 'задаются через --login, публикации читаются через API.',
+        )
+        parser.add_argument(
+            '--login', type=parse_login, action='append', dest='logins',
+            default=[], metavar='USERNAME:PASSWORD',
+            help='Учётная запись на сервере из --url, можно указать '
+                 'несколько раз.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Общее количество запросов.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Количество одновременных клиентов.',
+        )
+        parser.add_argument(
+            '--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+            help=f'Веса операций, по умолчанию {DEFAULT_MIX}.',
+        )
+        parser.add_argument(
+            '--users', type=int, default=50,
+            help='Количество пользователей нагрузочного теста во временной '
+                 'базе.',
+        )
+        parser.add_argument(
+            '--posts', type=int, default=1000,
+            help='Количество постов во временной базе.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--throttle', action='store_true',
+            help='Не отключать ограничение частоты запросов.',
+        )
+        parser.add_argument('--output', help='Файл для отчёта.')
+
+    def handle(self, *args, **options):
+        if min(options['requests'], options['concurrency'],
+               options['users']) <= 0:
+            raise CommandError(
+                '--requests, --concurrency и --users должны быть '
+                'положительными.'
+            )
+        if options['url'] and not options['logins']:
+            raise CommandError(
+                'С --url укажите хотя бы одну учётную запись через --login.'
+            )
+        if options['url']:
+            context = nullcontext()
+            transport = partial(HTTPTransport, options['url'])
+        else:
+            context, transport = scratch_database(), DjangoClientTransport
+        original_rates = BucketRateThrottle.THROTTLE_RATES
+        if not options['throttle'] and not options['url']:
+            BucketRateThrottle.THROTTLE_RATES = dict.fromkeys(
+                settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+            )
+        try:
+            with context:
+                report = self.run(transport, options)
+        finally:
+            BucketRateThrottle.THROTTLE_RATES = original_rates
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def prepare(self, transport, options):
+        """
+        Return credentials, usernames to follow and post ids.
+
+        Against a running server nothing is written: the credentials come
+        from ``--login`` and posts are read through the API. Otherwise users
+        and posts are created in the scratch database once.
+        """
+        if options['url']:
+            return self.discover(transport(), options['logins'])
+        usernames = [
+            f'{USERNAME_PREFIX}{i}' for i in range(options['users'])
+        ]
+        existing = set(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', flat=True))
+        # Один хеш на всех: PBKDF2 для каждого пользователя слишком долог.
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            User(username=username, password=password)
+            for username in usernames if username not in existing
+        )
+        if not Post.objects.exists():
+            authors = list(User.objects.filter(username__in=usernames))
+            rng = random.Random(options['seed'])
+            # В пустой базе подписок нет: посты разосланы по всем лентам.
+            Post.objects.bulk_create(
+                (Post(author=rng.choice(authors), text=f'Пост {i}',
+                      fanned_out=True)
+                 for i in range(options['posts'])),
+                batch_size=BATCH_SIZE,
+            )
+            Comment.objects.bulk_create(
+                (Comment(author=rng.choice(authors), post_id=post_id,
+                         text='Комментарий')
+                 for post_id in Post.objects.values_list('id', flat=True)),
+                batch_size=BATCH_SIZE,
+            )
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        if not post_ids:
+            raise CommandError('В базе нет публикаций.')
+        credentials = [(username, PASSWORD) for username in usernames]
+        return credentials, usernames, post_ids
+
+    def discover(self, transport, logins):
+        """Read post ids and authors from the first page of the API."""
+        status, content, _ = transport.request(
+            'GET', f'{OPERATIONS["post_list"][1]}?page_size=100', None, None
+        )
+        if status != 200:
+            raise CommandError(f'Не удалось получить публикации: {status}')
+        posts = json.loads(content)['results']
+        if not posts:
+            raise CommandError('На сервере нет публикаций.')
+        usernames = sorted(
+            {username for username, _ in logins}
+            | {post['author'] for post in posts}
+        )
+        return logins, usernames, [post['id'] for post in posts]
+
+    def run(self, transport, options):
+        credentials, usernames, post_ids = self.prepare(transport, options)
+        names = list(options['mix'])
+        weights = [options['mix'][name] for name in names]
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        remaining = [options['requests']]
+        failures = []
+
+        def worker(index):
+            try:
+                replay(index)
+            except Exception as error:
+                failures.append(error)
+            finally:
+                connection.close()
+
+        def replay(index):
+            rng = random.Random(options['seed'] * 1000 + index)
+            user = VirtualUser(
+                transport(), credentials[index % len(credentials)],
+                usernames, post_ids, rng,
+            )
+            user.login()
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                name = rng.choices(names, weights)[0]
+                sample = user.run(name)
+                with lock:
+                    samples[name].append(sample)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(options['concurrency'])
+        ]
+        started = perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = perf_counter() - started
+        if failures:
+            raise failures[0]
+        return self.report(samples, elapsed, options)
+
+    def report(self, samples, elapsed, options):
+        endpoints = {}
+        for name, items in sorted(samples.items()):
+            latencies = [latency for _, latency, _ in items]
+            queries = [count for _, _, count in items if count is not None]
+            statuses = defaultdict(int)
+            for status, _, _ in items:
+                statuses[str(status)] += 1
+            endpoints[name] = {
+                'requests': len(items),
+                'requests_per_second': round(len(items) / elapsed, 1),
+                'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                'queries_per_request': (
+                    round(sum(queries) / len(queries), 2) if queries else None
+                ),
+                'errors': sum(
+                    count for status, count in statuses.items()
+                    if int(status) not in OPERATIONS[name][2]
+                ),
+                'statuses': dict(statuses),
+            }
+        total = sum(len(items) for items in samples.values())
+        return {
+            'target': options['url'] or 'test-client',
+            'concurrency': options['concurrency'],
+            'requests': total,
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(total / elapsed, 1),
+            'endpoints': endpoints,
+        }
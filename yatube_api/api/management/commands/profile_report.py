@@ -0,0 +1,55 @@
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.profiling import ProfileRing, make_profile_token
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    help = (
+        'Объединяет сохранённые профили запросов по представлениям и '
+        'выводит самые затратные функции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'views', nargs='*',
+            help='Имена представлений, например PostViewSet.list. '
+                 'По умолчанию - все.',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Количество функций в отчёте по каждому представлению.',
+        )
+        parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument(
+            '--token', action='store_true',
+            help='Вывести значение заголовка X-Profile для профилирования '
+                 'отдельного запроса.',
+        )
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(make_profile_token())
+            return
+        ring = ProfileRing()
+        names = options['views'] or ring.names()
+        unknown = set(names) - set(ring.names())
+        if unknown:
+            raise CommandError(
+                f'Нет профилей для представлений: {", ".join(unknown)}'
+            )
+        if not names:
+            self.stdout.write('Профилей пока нет.')
+        for name in names:
+            output = io.StringIO()
+            stats = ring.merge(name, stream=output)
+            if stats is None:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: запросов {len(ring.samples(name))}'
+            ))
+            stats.sort_stats(options['sort']).print_stats(options['limit'])
+            self.stdout.write(output.getvalue())
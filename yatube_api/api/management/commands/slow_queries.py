@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.slowlog import read_log
+
+SORT_KEYS = {
+    'total': lambda item: item['total_ms'],
+    'count': lambda item: item['count'],
+    'max': lambda item: item['max_ms'],
+}
+
+
+def aggregate(entries):
+    """Group log entries by fingerprint."""
+    offenders = {}
+    for entry in entries:
+        item = offenders.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'sql': entry['sql'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': defaultdict(int),
+            'full_scans': set(),
+            'plan': None,
+        })
+        item['count'] += 1
+        item['total_ms'] += entry['duration_ms']
+        item['max_ms'] = max(item['max_ms'], entry['duration_ms'])
+        item['views'][entry['view'] or '-'] += 1
+        item['full_scans'].update(entry['full_scans'])
+        if entry.get('plan') is not None:
+            item['plan'] = entry['plan']
+    return list(offenders.values())
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит самые затратные медленные запросы из журнала '
+        'API_SLOW_QUERY_LOG, сгруппированные по отпечатку, с '
+        'представлениями и планом запроса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Количество запросов в отчёте.',
+        )
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total')
+        parser.add_argument(
+            '--full-scans', action='store_true',
+            help='Только запросы с полным просмотром отслеживаемых таблиц.',
+        )
+        parser.add_argument(
+            '--log', default=settings.API_SLOW_QUERY_LOG,
+            help='Путь к журналу медленных запросов.',
+        )
+
+    def handle(self, *args, **options):
+        offenders = aggregate(read_log(options['log']))
+        if options['full_scans']:
+            offenders = [item for item in offenders if item['full_scans']]
+        if not offenders:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        offenders.sort(key=SORT_KEYS[options['sort']], reverse=True)
+        for rank, item in enumerate(offenders[:options['limit']], 1):
+            self.write_offender(rank, item)
+
+    def write_offender(self, rank, item):
+        heading = (
+            f'{rank}. {item["fingerprint"]} calls={item["count"]} '
+            f'total={item["total_ms"]:.1f}ms '
+            f'avg={item["total_ms"] / item["count"]:.1f}ms '
+            f'max={item["max_ms"]:.1f}ms'
+        )
+        if item['full_scans']:
+            heading += ' FULL SCAN: ' + ', '.join(sorted(item['full_scans']))
+            heading = self.style.WARNING(heading)
+        self.stdout.write(heading)
+        views = sorted(item['views'].items(), key=lambda view: -view[1])
+        self.stdout.write('   views: ' + ', '.join(
+            f'{view} ({count})' for view, count in views
+        ))
+        self.stdout.write(f'   {item["sql"]}')
+        if item['plan']:
+            self.stdout.write('   plan: ' + ' | '.join(item['plan']))
@@ -0,0 +1,369 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .middleware import AsyncCapableMiddleware
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'),
+)
+SIZE_BUCKETS = (
+    100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, float('inf'),
+)
+
+# Семейства метрик: имя -> (тип, описание).
+FAMILIES = {
+    'api_requests_total': (
+        'counter', 'API responses by view, action, method and status.',
+    ),
+    'api_request_duration_seconds': (
+        'histogram', 'Time to produce an API response.',
+    ),
+    'api_response_size_bytes': (
+        'histogram', 'Size of non-streaming API response bodies.',
+    ),
+    'api_db_queries_total': (
+        'counter', 'Database queries issued by API requests.',
+    ),
+    'api_db_duration_seconds_total': (
+        'counter', 'Time API requests spent in database queries.',
+    ),
+}
+
+request_stats = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Measurements of the current request shared with the DB wrapper."""
+
+    __slots__ = ('labels', 'queries', 'db_time')
+
+    def __init__(self):
+        self.labels = None
+        self.queries = 0
+        self.db_time = 0.0
+
+
+def track_queries(execute, sql, params, many, context):
+    stats = request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += perf_counter() - started
+
+
+def install_query_tracking(sender, connection, **kwargs):
+    """
+    Add ``track_queries`` to every new database connection.
+
+    The wrapper is inserted first, because ``connection.execute_wrapper``
+    removes the last wrapper on exit.
+    """
+    if track_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, track_queries)
+
+
+def view_labels(request, view_func):
+    """Return ``(viewset, action)`` of a DRF view, or ``None``."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return None
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    return view_class.__name__, actions.get(method, method)
+
+
+class MmapValues:
+    """
+    Float values of one process in a memory-mapped file.
+
+    The file starts with the number of used bytes, followed by entries of
+    a length-prefixed key padded to 8 bytes and a double. Entries are only
+    appended and the used size is written after the entry, so other
+    processes can read the file at any moment.
+    """
+
+    header = struct.Struct('<Q')
+    length = struct.Struct('<I')
+    value = struct.Struct('<d')
+    initial_size = 64 * 1024
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(self.initial_size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.doubles = memoryview(self.map).cast('d')
+        self.used = self.header.unpack_from(self.map, 0)[0] or 8
+        self.positions = {
+            key: position for key, position in read_entries(self.map)
+        }
+
+    def position(self, key):
+        """Return the offset of the value of ``key``, adding it if new."""
+        position = self.positions.get(key)
+        if position is None:
+            position = self.append(key)
+        return position
+
+    def add(self, position, amount):
+        self.doubles[position // 8] += amount
+
+    def append(self, key):
+        encoded = key.encode()
+        padded = -(-(self.length.size + len(encoded)) // 8) * 8
+        size = padded + self.value.size
+        if self.used + size > len(self.map):
+            self.doubles.release()
+            self.map.close()
+            self.file.truncate(max(2 * os.fstat(self.file.fileno()).st_size,
+                                   self.used + size))
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.doubles = memoryview(self.map).cast('d')
+        self.length.pack_into(self.map, self.used, len(encoded))
+        start = self.used + self.length.size
+        self.map[start:start + len(encoded)] = encoded
+        position = self.used + padded
+        self.value.pack_into(self.map, position, 0.0)
+        self.used += size
+        self.header.pack_into(self.map, 0, self.used)
+        self.positions[key] = position
+        return position
+
+    def close(self):
+        self.doubles.release()
+        self.map.close()
+        self.file.close()
+
+
+def read_entries(buffer):
+    """Yield ``(key, value position)`` of the entries in ``buffer``."""
+    used = MmapValues.header.unpack_from(buffer, 0)[0]
+    position = MmapValues.header.size
+    while position < used:
+        length = MmapValues.length.unpack_from(buffer, position)[0]
+        start = position + MmapValues.length.size
+        key = bytes(buffer[start:start + length]).decode()
+        position += -(-(MmapValues.length.size + length) // 8) * 8
+        yield key, position
+        position += MmapValues.value.size
+
+
+class MetricsRegistry:
+    """
+    Record metrics into a per-process file under ``API_METRICS_DIR``.
+
+    A measurement is a dict lookup and an in-place update of a double in
+    shared memory; the ``/metrics`` view sums the files of all processes,
+    including finished ones, so counters never go back. Clear the directory
+    when the whole service restarts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = None
+        self._directory = None
+        self._positions = {}
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        # Потомок после fork пишет в собственный файл.
+        self._values = None
+        self._directory = None
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def get_values(self):
+        # Сравнение по идентичности: разбор пути на каждый запрос дорог.
+        directory = settings.API_METRICS_DIR
+        if self._values is None or directory is not self._directory:
+            if self._values is not None:
+                self._values.close()
+            self._values = MmapValues(
+                Path(directory) / f'{os.getpid()}.metrics'
+            )
+            self._directory = directory
+            self._positions = {}
+        return self._values
+
+    def position(self, values, cache_key, name, labels):
+        # Смещения кешируются по кортежу меток: JSON-ключ строится один раз.
+        position = self._positions.get(cache_key)
+        if position is None:
+            position = values.position(json.dumps([name, labels]))
+            self._positions[cache_key] = position
+        return position
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            values = self.get_values()
+            values.add(
+                self.position(values, (name, labels), name, labels), amount
+            )
+
+    def observe(self, name, labels, value, buckets):
+        index = bisect_left(buckets, value)
+        with self._lock:
+            values = self.get_values()
+            values.add(self.position(
+                values, (name, labels, index), f'{name}_bucket',
+                labels + (('le', format_value(buckets[index])),),
+            ), 1)
+            values.add(self.position(
+                values, (name, labels, 'count'), f'{name}_count', labels
+            ), 1)
+            values.add(self.position(
+                values, (name, labels, 'sum'), f'{name}_sum', labels
+            ), value)
+
+    def collect(self):
+        """Return ``{(name, labels): value}`` summed over all processes."""
+        totals = defaultdict(float)
+        directory = Path(settings.API_METRICS_DIR)
+        for path in directory.glob('*.metrics'):
+            buffer = path.read_bytes()
+            if len(buffer) < MmapValues.header.size:
+                continue
+            for key, position in read_entries(buffer):
+                name, labels = json.loads(key)
+                totals[name, tuple(map(tuple, labels))] += (
+                    MmapValues.value.unpack_from(buffer, position)[0]
+                )
+        return totals
+
+
+registry = MetricsRegistry()
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def cumulate_buckets(samples):
+    """Turn per-bucket counts into Prometheus cumulative buckets."""
+    series = defaultdict(list)
+    for (name, labels), value in samples:
+        if name.endswith('_bucket'):
+            bound = dict(labels)['le']
+            rest = tuple(item for item in labels if item[0] != 'le')
+            series[name, rest].append((float(bound), bound, value))
+            continue
+        yield name, labels, value
+    for (name, rest), bounds in sorted(series.items()):
+        total = 0
+        for _, bound, value in sorted(bounds):
+            total += value
+            yield name, rest + (('le', bound),), total
+
+
+def render_metrics(totals):
+    """Return the Prometheus text exposition of collected ``totals``."""
+    families = defaultdict(list)
+    for (name, labels), value in sorted(totals.items()):
+        family = next(
+            (family for family in FAMILIES if name.startswith(family)), name
+        )
+        families[family].append(((name, labels), value))
+    lines = []
+    for family, samples in sorted(families.items()):
+        kind, description = FAMILIES.get(family, ('untyped', ''))
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        for name, labels, value in cumulate_buckets(samples):
+            lines.append(
+                f'{name}{format_labels(labels)} {format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Expose the metrics of all worker processes of the host."""
+    return HttpResponse(
+        render_metrics(registry.collect()), content_type=CONTENT_TYPE
+    )
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Record latency, status, size and DB usage of every API response.
+
+    Only DRF views are measured, labelled with the viewset (or view class)
+    and the action. Queries are counted by ``track_queries`` in whatever
+    thread the view runs, because the stats travel in a context variable.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        self.record(request, response, stats, perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_stats.reset(token)
+        self.record(request, response, stats, perf_counter() - started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_stats.get().labels = view_labels(request, view_func)
+
+    def record(self, request, response, stats, elapsed):
+        if stats.labels is None:
+            return
+        labels = (('view', stats.labels[0]), ('action', stats.labels[1]))
+        registry.inc('api_requests_total', labels + (
+            ('method', request.method), ('status', str(response.status_code)),
+        ))
+        registry.observe(
+            'api_request_duration_seconds', labels, elapsed, DURATION_BUCKETS
+        )
+        if not response.streaming:
+            registry.observe(
+                'api_response_size_bytes', labels, len(response.content),
+                SIZE_BUCKETS,
+            )
+        registry.inc('api_db_queries_total', labels, stats.queries)
+        registry.inc('api_db_duration_seconds_total', labels, stats.db_time)
@@ -0,0 +1,44 @@
+import asyncio
+
+
+class AsyncCapableMiddleware:
+    """
+    Base class for middleware serving both WSGI and ASGI without switching
+    threads.
+
+    Under ASGI Django awaits the instance, so it is marked as a coroutine
+    function, ``__call__`` returns the ``__acall__`` coroutine and the
+    handler gets ``aprocess_view`` instead of ``process_view``. Unlike
+    Django's ``MiddlewareMixin`` no hook is wrapped with ``sync_to_async``.
+
+    Subclasses wrapping the response override both ``__call__``, which
+    returns ``self.__acall__(request)`` when ``is_async`` is set, and
+    ``__acall__``. The default ``aprocess_view`` runs ``process_view`` in
+    the event loop, so it must not touch the database.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Django вызовет корутину и не будет переключать поток.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            if hasattr(self, 'process_view'):
+                self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        return type(self).process_view(
+            self, request, view_func, view_args, view_kwargs
+        )
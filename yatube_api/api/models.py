@@ -1 +1,24 @@
-# from django.db import models
+from django.db import models
+
+
+class RevokedToken(models.Model):
+    """
+    Represent a revoked JWT.
+
+    Attributes:
+        jti (str): The unique identifier claim of the token.
+        expires_at (datetime): When the token expires; after that the row
+            is useless and is removed by ``compact_revoked_tokens``.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        """
+        Return a string representation of the revoked token.
+
+        Returns:
+            str: The token identifier.
+        """
+        return self.jti
@@ -1,12 +1,174 @@
-from rest_framework.pagination import LimitOffsetPagination
+from base64 import b64decode, b64encode
+from urllib import parse
 
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PostLimitOffsetPagination(LimitOffsetPagination):
+    """Legacy limit/offset pagination kept for existing clients."""
 
-class PostPagination(LimitOffsetPagination):
     default_limit = 10
     max_limit = 100
 
+
+class PostPagination(BasePagination):
+    """
+    Keyset pagination for posts over ``(pub_date, id)``.
+
+    Every page is fetched with a ``WHERE (pub_date, id) < cursor`` condition
+    instead of ``OFFSET``, so the cost of a page does not depend on how deep
+    the client has scrolled. The cursor is opaque for clients and is passed
+    back through the ``next``/``previous`` links.
+
+    Requests carrying ``limit`` or ``offset`` are served by
+    ``PostLimitOffsetPagination`` for backward compatibility. Search results
+    are ordered by rank instead of date, so they are paginated the same way.
+    """
+
+    page_size = 10
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-pub_date', '-id')
+    legacy_query_params = ('limit', 'offset', 'search')
+    legacy_class = PostLimitOffsetPagination
+    invalid_cursor_message = 'Некорректный курсор.'
+
     def paginate_queryset(self, queryset, request, view=None):
-        if ('limit' not in request.query_params
-                and 'offset' not in request.query_params):
+        self.request = request
+        self.legacy = None
+        if any(param in request.query_params
+               for param in self.legacy_query_params):
+            self.legacy = self.legacy_class()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        reverse = False
+        if cursor is not None:
+            pub_date, pk, reverse = cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                ).reverse()
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                )
+
+        # Лишняя запись показывает, есть ли данные за пределами страницы.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
             return None
-        return super().paginate_queryset(queryset, request, view)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        """Return ``(pub_date, id, reverse)``, ``None`` for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            pub_date = parse_datetime(tokens['p'][0])
+            pk = int(tokens['i'][0])
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk, reverse
+
+    def encode_cursor(self, post, reverse):
+        # Страница может состоять из моделей или из строк values().
+        if isinstance(post, dict):
+            pub_date, pk = post['pub_date'], post['id']
+        else:
+            pub_date, pk = post.pub_date, post.pk
+        tokens = {'p': pub_date.isoformat(), 'i': pk}
+        if reverse:
+            tokens['r'] = '1'
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            encoded
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы из ссылок next/previous.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Количество публикаций на страницу.',
+                'schema': {'type': 'integer'},
+            },
+        ] + self.legacy_class().get_schema_operation_parameters(view)
+
+
+class FeedPagination(PostPagination):
+    """
+    Keyset pagination of the home feed.
+
+    The feed merges two sources, so the view hands the cursor and the page
+    size to ``feed_queryset`` to limit each of them. Offsets cannot be
+    applied to such a page and are not supported.
+    """
+
+    legacy_query_params = ()
+
+    def get_feed_page(self, request):
+        """Return ``(cursor, limit)`` of the requested page."""
+        return self.decode_cursor(request), self.get_page_size(request) + 1
@@ -0,0 +1,153 @@
+import asyncio
+import cProfile
+import marshal
+import os
+import pstats
+import random
+import re
+from functools import partial
+from pathlib import Path
+from time import time_ns
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+
+from .asyncviews import call_view
+from .metrics import view_labels
+from .middleware import AsyncCapableMiddleware
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+SIGNING_SALT = 'api.profiling'
+
+
+def make_profile_token():
+    """Return a signed value of the ``X-Profile`` request header."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def check_profile_token(value):
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            value, max_age=settings.API_PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def view_name(request, view_func):
+    """Return a name such as ``PostViewSet.list`` for a resolved view."""
+    labels = view_labels(request, view_func)
+    if labels is None:
+        name = f'{view_func.__module__}.{view_func.__name__}'
+    else:
+        name = '.'.join(labels)
+    return re.sub(r'[^\w.-]', '_', name)
+
+
+class ProfileRing:
+    """
+    Keep the last ``size`` profiles of every view as pstats dumps on disk.
+
+    Each view has a directory of dumps named by their creation time; a
+    process that adds a dump removes the oldest ones over the limit, so the
+    ring stays bounded with any number of writers.
+    """
+
+    def __init__(self, directory=None, size=None):
+        self.directory = Path(directory or settings.API_PROFILE_DIR)
+        self.size = size or settings.API_PROFILE_RING_SIZE
+
+    def save(self, name, profiler):
+        profiler.create_stats()
+        directory = self.directory / name
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{time_ns()}-{os.getpid()}.prof'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_bytes(marshal.dumps(profiler.stats))
+        # Читатели не должны увидеть недописанный файл.
+        os.replace(temporary, path)
+        for old in self.samples(name)[:-self.size]:
+            old.unlink(missing_ok=True)
+
+    def samples(self, name):
+        directory = self.directory / name
+        if not directory.is_dir():
+            return []
+        return sorted(directory.glob('*.prof'))
+
+    def names(self):
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            path.name for path in self.directory.iterdir() if path.is_dir()
+        )
+
+    def merge(self, name, stream=None):
+        """Return merged ``pstats.Stats`` of a view, or ``None``."""
+        stats = None
+        for path in self.samples(name):
+            try:
+                if stats is None:
+                    stats = pstats.Stats(str(path), stream=stream)
+                else:
+                    stats.add(str(path))
+            except (FileNotFoundError, EOFError, ValueError):
+                # Файл удалён другим процессом при переполнении кольца.
+                continue
+        return stats
+
+
+def profile_call(name, view, request, *args, **kwargs):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    finally:
+        profiler.disable()
+        ProfileRing().save(name, profiler)
+    return response
+
+
+class ProfilingMiddleware(AsyncCapableMiddleware):
+    """
+    Profile a sample of requests with cProfile.
+
+    A request is profiled with probability ``API_PROFILE_SAMPLE_RATE`` or
+    when it carries a valid ``X-Profile`` header made by
+    ``make_profile_token``. The view and the rendering of its response run
+    under the profiler, and the stats are stored per view in a
+    ``ProfileRing``; ``manage.py profile_report`` merges and prints them.
+    """
+
+    def should_profile(self, request):
+        if random.random() < settings.API_PROFILE_SAMPLE_RATE:
+            return True
+        token = request.META.get(PROFILE_HEADER)
+        return token is not None and check_profile_token(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.should_profile(request):
+            return None
+        return profile_call(
+            view_name(request, view_func), view_func, request,
+            *view_args, **view_kwargs
+        )
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        if not self.should_profile(request):
+            return None
+        view = view_func
+        if asyncio.iscoroutinefunction(view_func):
+            # Асинхронное чтение выполняется в пуле потоков, где cProfile
+            # этого потока не видит, поэтому вызывается исходное
+            # синхронное представление.
+            view = partial(call_view, view_func.__wrapped__)
+        return await sync_to_async(profile_call)(
+            view_name(request, view_func), view, request,
+            *view_args, **view_kwargs
+        )
@@ -0,0 +1,143 @@
+import random
+from contextvars import ContextVar
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .middleware import AsyncCapableMiddleware
+
+PIN_COOKIE = 'db_primary_pin'
+PIN_PREFIX = 'api:pin:'
+
+routing_state = ContextVar('routing_state', default=None)
+
+
+class RoutingState:
+    """Database routing decisions of the current request."""
+
+    def __init__(self, safe):
+        self.safe = safe
+        self.use_replica = False
+        self.used_replica = False
+        self.written = False
+        self.user_id = None
+
+
+def used_replica():
+    """Return whether the current request has read from a replica."""
+    state = routing_state.get()
+    return state is not None and state.used_replica
+
+
+def route_user(user):
+    """
+    Tell the routing of the current request who the client is.
+
+    Reads of a user who wrote within ``DATABASE_REPLICA_LAG`` seconds go to
+    the primary, so clients that drop cookies read their own writes too.
+    Called by the authentication class once the user is known.
+    """
+    state = routing_state.get()
+    if state is None:
+        return
+    state.user_id = user.pk
+    if state.use_replica and caches[settings.API_CACHE_ALIAS].get(
+        f'{PIN_PREFIX}{user.pk}'
+    ):
+        state.use_replica = False
+
+
+class ReplicaRouter:
+    """
+    Send reads of replica-enabled requests to ``DATABASE_REPLICAS``.
+
+    Everything else - writes, reads outside a request, reads inside a
+    transaction and reads after a write in the same request - goes to the
+    primary. Models in ``primary_models`` are always read from the primary
+    because a lagging copy of them is a security issue.
+    """
+
+    primary_models = {'api.revokedtoken'}
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (state is None or not state.use_replica or state.written
+                or not settings.DATABASE_REPLICAS
+                or model._meta.label_lower in self.primary_models
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        state.used_replica = True
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат копию той же базы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """
+    Enable replica reads for safe requests to replica-enabled views.
+
+    A view opts in with a truthy ``read_from_replica`` attribute. After a
+    write the client gets a cookie that pins its reads to the primary for
+    ``DATABASE_REPLICA_LAG`` seconds, so it sees its own changes while the
+    replicas catch up. The authenticated user is pinned as well, in the
+    shared cache, for clients that do not keep cookies.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = RoutingState(request.method in SAFE_METHODS)
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        state = RoutingState(request.method in SAFE_METHODS)
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.process_response(state, response)
+
+    def process_response(self, state, response):
+        if not state.written:
+            return response
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_LAG,
+            httponly=True, samesite='Lax',
+        )
+        if state.user_id is not None:
+            caches[settings.API_CACHE_ALIAS].set(
+                f'{PIN_PREFIX}{state.user_id}', time(),
+                settings.DATABASE_REPLICA_LAG,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routing_state.get()
+        view_class = getattr(view_func, 'cls', None)
+        state.use_replica = (
+            state.safe
+            and PIN_COOKIE not in request.COOKIES
+            and getattr(view_class, 'read_from_replica', False)
+        )
@@ -0,0 +1,96 @@
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.utils import timezone
+
+from .bloom import BloomFilter
+from .models import RevokedToken
+
+
+class RevocationStore:
+    """
+    Revoked token identifiers with an in-memory Bloom filter in front.
+
+    The filter is built from the database on first use and refreshed with
+    rows added since the last check every ``API_REVOCATION_REFRESH``
+    seconds, so revocations made by other worker processes are picked up
+    without a query per request. Only identifiers the filter reports as
+    possibly revoked are looked up in the database. The filter is rebuilt
+    from scratch every ``API_REVOCATION_REBUILD`` seconds to drop expired
+    tokens, and earlier if it holds more than its capacity.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self._bloom = None
+        self._last_id = 0
+        self._built_at = self._refreshed_at = 0.0
+
+    def _rebuild(self):
+        rows = list(
+            RevokedToken.objects.filter(
+                expires_at__gt=timezone.now()
+            ).values_list('id', 'jti')
+        )
+        bloom = BloomFilter(
+            max(settings.API_REVOCATION_BLOOM_CAPACITY, 2 * len(rows)),
+            settings.API_REVOCATION_BLOOM_ERROR_RATE,
+        )
+        for _, jti in rows:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._last_id = max((pk for pk, _ in rows), default=self._last_id)
+        self._built_at = self._refreshed_at = monotonic()
+
+    def _refresh(self):
+        rows = RevokedToken.objects.filter(
+            id__gt=self._last_id
+        ).values_list('id', 'jti')
+        for pk, jti in rows:
+            self._bloom.add(jti)
+            self._last_id = max(self._last_id, pk)
+        self._refreshed_at = monotonic()
+
+    def sync(self):
+        """Load the filter or pull rows revoked since the last call."""
+        now = monotonic()
+        with self._lock:
+            if (self._bloom is None
+                    or now - self._built_at > settings.API_REVOCATION_REBUILD
+                    or self._bloom.count
+                    > settings.API_REVOCATION_BLOOM_CAPACITY):
+                self._rebuild()
+            elif now - self._refreshed_at > settings.API_REVOCATION_REFRESH:
+                self._refresh()
+
+    def is_revoked(self, jti):
+        self.sync()
+        if jti not in self._bloom:
+            return False
+        return RevokedToken.objects.filter(
+            jti=jti, expires_at__gt=timezone.now()
+        ).exists()
+
+    def revoke(self, jti, expires_at):
+        RevokedToken.objects.get_or_create(
+            jti=jti, defaults={'expires_at': expires_at}
+        )
+        self.sync()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def compact(self):
+        """Delete expired rows; returns the number of deleted tokens."""
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        with self._lock:
+            self._bloom = None
+        return deleted
+
+
+revoked_tokens = RevocationStore()
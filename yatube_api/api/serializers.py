@@ -1,20 +1,33 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
+from rest_framework_simplejwt.serializers import (TokenRefreshSerializer,
+                                                  TokenVerifySerializer)
+from rest_framework_simplejwt.settings import api_settings
 from posts.models import Comment, Post, Follow, Group
+from posts.search import highlight
 from django.contrib.auth import get_user_model
 
+from .timing import TimedSerializerMixin
+from .tokens import refresh_token, revoke_token, verify_token
+
 User = get_user_model()
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serialize and deserialize Post instances.
 
     Converts Post model instances into JSON format and vice versa.
     Includes fields such as author, text, pub_date, and image.
+    ``image_variants`` links every size variant of the image; variants
+    that are not rendered yet point to an endpoint that renders them on
+    the first request.
     """
 
     author = SlugRelatedField(slug_field='username', read_only=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         """
@@ -23,11 +36,68 @@ class PostSerializer(serializers.ModelSerializer):
         Specifies the model and fields to include in serialization.
         """
 
-        fields = '__all__'
+        fields = ['id', 'author', 'text', 'pub_date', 'image', 'group',
+                  'image_variants']
         model = Post
 
+    row_method_fields = {
+        'image_variants': ('id', 'image', 'image_variants'),
+    }
+
+    def get_image_variants(self, post):
+        if not post.image:
+            return None
+        return self.image_variant_urls(post.pk, post.image_variants)
+
+    def get_image_variants_from_row(self, row):
+        """Same as ``get_image_variants`` for a ``values()`` row."""
+        if not row['image']:
+            return None
+        return self.image_variant_urls(row['id'], row['image_variants'])
+
+    def image_variant_urls(self, pk, variants):
+        request = self.context.get('request')
+        storage = Post._meta.get_field('image').storage
+        urls = {}
+        for variant in settings.POST_IMAGE_VARIANTS:
+            if variant in variants:
+                url = storage.url(variants[variant])
+            else:
+                url = reverse(
+                    'post-image-variant',
+                    kwargs={'pk': pk, 'variant': variant},
+                )
+            urls[variant] = (
+                request.build_absolute_uri(url) if request else url
+            )
+        return urls
+
+
+class PostSearchSerializer(PostSerializer):
+    """
+    Serialize posts found by full-text search.
+
+    Adds the bm25 ``rank`` of the match (lower is better) and a ``snippet``
+    of the text: HTML-escaped, with the matched words wrapped in ``<b>``.
+    """
+
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.SerializerMethodField()
+    row_method_fields = {
+        **PostSerializer.row_method_fields, 'snippet': ['snippet'],
+    }
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['rank', 'snippet']
+
+    def get_snippet(self, post):
+        return highlight(post.snippet)
+
+    def get_snippet_from_row(self, row):
+        return highlight(row['snippet'])
+
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serialize and deserialize Comment instances.
 
@@ -51,7 +121,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Follow model.
 
@@ -72,7 +142,40 @@ class FollowSerializer(serializers.ModelSerializer):
         fields = ['user', 'following']
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = '__all__'
+
+
+class CachedTokenVerifySerializer(TokenVerifySerializer):
+    """Verify a token, skipping the decode for tokens verified before."""
+
+    def validate(self, attrs):
+        verify_token(attrs['token'])
+        return {}
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh an access token unless the refresh token is revoked."""
+
+    def validate(self, attrs):
+        refresh = refresh_token(attrs['refresh'])
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                revoke_token(attrs['refresh'])
+            refresh.set_jti()
+            refresh.set_exp()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Revoke an access or refresh token until it expires."""
+
+    token = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        revoke_token(attrs['token'])
+        return {}
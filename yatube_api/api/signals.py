@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Group, Post
+
+from .authentication import evict_user
+from .cache import (GROUPS, POSTS, USERS, bump_generations,
+                    comments_generation, post_generation, user_generation)
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    """Invalidate post listings and the detail of the changed post."""
+    bump_generations(POSTS, post_generation(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    """Invalidate the comments of the post the comment belongs to."""
+    bump_generations(comments_generation(instance.post_id))
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    """
+    Invalidate group responses.
+
+    Posts depend on groups as well: deleting a group clears ``Post.group``
+    with a bulk update that sends no post signals.
+    """
+    bump_generations(GROUPS)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user(sender, instance, created=False, **kwargs):
+    """
+    Invalidate responses that render usernames and the cached user.
+
+    Deactivation is a save as well, so an inactive user is rejected on the
+    next request instead of being served from the cache: the user's own
+    generation tells the other worker processes to reload it. A new user
+    appears in no cached response and invalidates nothing.
+    """
+    if created:
+        return
+    bump_generations(USERS, user_generation(instance.pk))
+    evict_user(instance)
@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from hashlib import md5
+from logging.handlers import RotatingFileHandler
+from time import perf_counter
+
+from django.conf import settings
+
+from .lru import ExpiringLRUCache
+from .metrics import request_stats
+
+logger = logging.getLogger('api.slow_queries')
+
+# Планы запросов по отпечатку: EXPLAIN выполняется один раз на процесс.
+_plans = ExpiringLRUCache(maxsize=10_000)
+_handler = None
+_handler_lock = threading.Lock()
+
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+PLAN_TTL = 24 * 60 * 60
+
+_NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+# Обход по индексу в порядке сортировки читает всю таблицу, если у запроса
+# нет LIMIT.
+_FULL_SCAN = re.compile(r'^SCAN (\w+)( USING (?:COVERING )?INDEX \w+)?$')
+_LIMIT = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+# Псевдонимы таблиц в SQL Django: "posts_post" U0.
+_ALIAS = re.compile(r'"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?')
+
+
+def fingerprint(sql):
+    """
+    Return ``(digest, normalized SQL)`` of a statement.
+
+    Literals and placeholders become ``?`` and lists of them ``(...)``, so
+    statements differing only in parameters share a fingerprint.
+    """
+    normalized = sql.strip()
+    for pattern, replacement in _NORMALIZE:
+        normalized = pattern.sub(replacement, normalized)
+    return md5(normalized.encode()).hexdigest()[:16], normalized
+
+
+def full_scans(sql, plan):
+    """Return watched tables that ``plan`` of ``sql`` reads whole."""
+    aliases = {alias: table for table, alias in _ALIAS.findall(sql)}
+    limited = _LIMIT.search(sql) is not None
+    tables = []
+    for detail in plan:
+        match = _FULL_SCAN.match(detail)
+        if not match or match[2] and limited:
+            continue
+        table = aliases.get(match[1], match[1])
+        if table in settings.API_SLOW_QUERY_SCAN_TABLES:
+            tables.append(table)
+    return tables
+
+
+def explain(connection, sql, params, many):
+    if connection.vendor != 'sqlite' or not sql.lstrip().upper().startswith(
+        EXPLAINED_STATEMENTS
+    ):
+        return []
+    if many:
+        params = next(iter(params), None)
+    # Курсор драйвера: запрос не проходит через обёртки Django.
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def reset_plans():
+    """Forget explained fingerprints, so that they are explained again."""
+    _plans.clear()
+
+
+def get_logger():
+    """Return the slow query logger writing to ``API_SLOW_QUERY_LOG``."""
+    global _handler
+    path = os.path.abspath(settings.API_SLOW_QUERY_LOG)
+    with _handler_lock:
+        if _handler is None or _handler.baseFilename != path:
+            if _handler is not None:
+                logger.removeHandler(_handler)
+                _handler.close()
+            _handler = RotatingFileHandler(
+                path, maxBytes=settings.API_SLOW_QUERY_LOG_SIZE,
+                backupCount=settings.API_SLOW_QUERY_LOG_BACKUPS,
+                encoding='utf-8', delay=True,
+            )
+            logger.addHandler(_handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+def record_slow_query(connection, sql, params, many, duration):
+    digest, normalized = fingerprint(sql)
+    plan = _plans.get(digest)
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'duration_ms': round(duration * 1000, 3),
+        'fingerprint': digest,
+        'view': None,
+        'sql': normalized,
+    }
+    stats = request_stats.get()
+    if stats is not None and stats.labels is not None:
+        entry['view'] = '.'.join(stats.labels)
+    if plan is None:
+        try:
+            plan = explain(connection, sql, params, many)
+        except Exception as error:
+            plan = [f'EXPLAIN failed: {error}']
+        _plans.set(digest, plan, PLAN_TTL)
+        entry['plan'] = plan
+    entry['full_scans'] = full_scans(sql, plan)
+    get_logger().info(json.dumps(entry, ensure_ascii=False))
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    threshold = settings.API_SLOW_QUERY_THRESHOLD
+    if threshold is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        if duration >= threshold:
+            record_slow_query(
+                context['connection'], sql, params, many, duration
+            )
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """Add ``log_slow_queries`` to every new database connection."""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_queries)
+
+
+def read_log(path):
+    """Yield entries of the log at ``path`` and its rotated copies."""
+    for index in range(settings.API_SLOW_QUERY_LOG_BACKUPS, -1, -1):
+        name = f'{path}.{index}' if index else str(path)
+        try:
+            with open(name, encoding='utf-8') as file:
+                lines = list(file)
+        except FileNotFoundError:
+            continue
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Строка, дописываемая другим процессом прямо сейчас.
+                continue
@@ -0,0 +1,53 @@
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+STREAM_QUERY_PARAM = 'stream'
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class StreamingListMixin:
+    """
+    Stream ``list`` as a JSON array when the client sends ``?stream=1``.
+
+    Rows are read with ``QuerySet.iterator(chunk_size=...)`` and rendered
+    one by one, so memory use does not grow with the number of rows and the
+    first bytes are sent before the whole collection is serialized. The
+    body is byte-identical to the regular unpaginated JSON response.
+    Streaming skips pagination.
+    """
+
+    stream_chunk_size = 500
+    stream_ordering = None
+
+    def is_streaming(self):
+        request = self.request
+        return (
+            request.accepted_renderer.format == 'json'
+            and request.query_params.get(STREAM_QUERY_PARAM, '').lower()
+            in TRUE_VALUES
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_streaming():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.stream_ordering and not queryset.query.order_by:
+            queryset = queryset.order_by(*self.stream_ordering)
+        return StreamingHttpResponse(
+            self.stream_rows(queryset),
+            content_type=request.accepted_renderer.media_type,
+        )
+
+    def iter_representations(self, queryset):
+        serializer = self.get_serializer()
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            yield serializer.to_representation(obj)
+
+    def stream_rows(self, queryset):
+        renderer = JSONRenderer()
+        separator = b''
+        yield b'['
+        for data in self.iter_representations(queryset):
+            yield separator + renderer.render(data)
+            separator = b','
+        yield b']'
@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+from time import time
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+# Пополнение корзины вычисляется прямо в запросе. RETURNING не используется:
+# он появился только в SQLite 3.35, поэтому результат читается отдельным
+# SELECT в той же транзакции.
+CONSUME_SQL = '''
+INSERT INTO buckets (key, tokens, allowed, updated)
+VALUES (:key, :capacity - 1, 1, :now)
+ON CONFLICT (key) DO UPDATE SET
+    allowed = min(:capacity, tokens + (:now - updated) * :rate) >= 1,
+    tokens = min(:capacity, tokens + (:now - updated) * :rate)
+        - (min(:capacity, tokens + (:now - updated) * :rate) >= 1),
+    updated = :now
+'''
+
+BUCKET_SQL = 'SELECT allowed, tokens FROM buckets WHERE key = :key'
+
+SCHEMA_SQL = '''
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    allowed INTEGER NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID
+'''
+
+
+class BucketStore:
+    """
+    Token buckets kept in a SQLite file shared by all worker processes.
+
+    Each check is an ``INSERT ... ON CONFLICT DO UPDATE`` on the primary key
+    followed by a ``SELECT`` of the bucket, both in one ``BEGIN IMMEDIATE``
+    transaction, so checks of all processes are serialized and their cost
+    does not depend on the number of clients or on their request history.
+    Connections are opened per thread and point to ``API_THROTTLE_DB``.
+    """
+
+    # Раз в столько проверок процесс удаляет давно не изменявшиеся корзины.
+    purge_every = 10_000
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get_connection(self):
+        path = str(settings.API_THROTTLE_DB)
+        if getattr(self._local, 'path', None) != path:
+            connection = sqlite3.connect(
+                path, timeout=5, isolation_level=None
+            )
+            # Потеря состояния при сбое питания для ограничителя не страшна.
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(SCHEMA_SQL)
+            self._local.connection = connection
+            self._local.path = path
+            self._local.calls = 0
+        return self._local.connection
+
+    def consume(self, key, capacity, duration):
+        """
+        Take a token from the bucket of ``key``.
+
+        Args:
+            key (str): The bucket key.
+            capacity (int): Bucket size, the allowed burst.
+            duration (int): Seconds in which a full bucket refills.
+
+        Returns:
+            tuple: ``(allowed, tokens)`` - whether the request may proceed
+            and the number of tokens left.
+        """
+        connection = self.get_connection()
+        now = time()
+        params = {
+            'key': key,
+            'capacity': capacity,
+            'rate': capacity / duration,
+            'now': now,
+        }
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(CONSUME_SQL, params)
+            allowed, tokens = connection.execute(BUCKET_SQL, params).fetchone()
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        self._local.calls += 1
+        if self._local.calls % self.purge_every == 0:
+            self.purge(now - settings.API_THROTTLE_PURGE_AGE)
+        return bool(allowed), tokens
+
+    def purge(self, before):
+        """Delete buckets untouched since ``before``; they are full again."""
+        self.get_connection().execute(
+            'DELETE FROM buckets WHERE updated < ?', (before,)
+        )
+
+    def clear(self):
+        self.get_connection().execute('DELETE FROM buckets')
+
+
+bucket_store = BucketStore()
+
+
+class BucketRateThrottle(SimpleRateThrottle):
+    """
+    ``SimpleRateThrottle`` on top of ``BucketStore``.
+
+    A rate of ``N/period`` gives a bucket of ``N`` requests that refills
+    continuously over ``period``: bursts up to ``N`` are allowed, then
+    requests are spread evenly. DRF's cache-based throttles keep a list of
+    timestamps per client instead, which grows with the rate.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self.tokens = bucket_store.consume(
+            self.key, self.num_requests, self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class LoginRateThrottle(BucketRateThrottle):
+    """Limit token obtain attempts per IP address."""
+
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class ReadWriteRateThrottle(BucketRateThrottle):
+    """
+    Limit requests per user, or per IP address for anonymous clients.
+
+    Safe methods use the ``read`` scope, the others use ``write``.
+    """
+
+    def __init__(self):
+        # Область зависит от метода запроса и выбирается в allow_request().
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = 'read' if request.method in SAFE_METHODS else 'write'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
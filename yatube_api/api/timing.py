@@ -0,0 +1,136 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+
+from .metrics import request_stats
+
+server_timing = ContextVar('server_timing', default=None)
+
+
+def db_usage():
+    """Return ``(queries, seconds)`` spent in the DB by this request."""
+    stats = request_stats.get()
+    if stats is None:
+        return 0, 0.0
+    return stats.queries, stats.db_time
+
+
+class ServerTiming:
+    """
+    Durations of the phases of one API request.
+
+    Every phase except ``db`` excludes the database queries issued inside
+    it, so the phases do not overlap. Database time comes from the query
+    wrapper of ``api.metrics``. A phase started inside another phase is
+    counted as part of the outer one.
+    """
+
+    phases = ('auth', 'perm', 'db', 'serialize', 'render', 'total')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries, self.db_started = db_usage()
+        self.durations = dict.fromkeys(self.phases, 0.0)
+        self.active = False
+
+    @contextmanager
+    def measure(self, phase):
+        if self.active:
+            yield
+            return
+        self.active = True
+        started, (_, db_started) = perf_counter(), db_usage()
+        try:
+            yield
+        finally:
+            self.active = False
+            self.durations[phase] += (
+                perf_counter() - started - (db_usage()[1] - db_started)
+            )
+
+    def stop_view(self):
+        queries, db_time = db_usage()
+        self.queries = queries - self.queries
+        self.durations['db'] = db_time - self.db_started
+
+    def finish(self, response, render_started=None):
+        if render_started is not None:
+            self.durations['render'] = perf_counter() - render_started
+        self.durations['total'] = perf_counter() - self.started
+        response['Server-Timing'] = self.header()
+
+    def header(self):
+        metrics = []
+        for phase, seconds in self.durations.items():
+            metric = f'{phase};dur={seconds * 1000:.2f}'
+            if phase == 'db':
+                metric += f';desc="{self.queries} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+def measure(phase):
+    """Measure ``phase`` of the current request if it is being timed."""
+    timing = server_timing.get()
+    return nullcontext() if timing is None else timing.measure(phase)
+
+
+class TimedSerializerMixin:
+    """Count ``to_representation`` as the ``serialize`` phase."""
+
+    def to_representation(self, instance):
+        timing = server_timing.get()
+        if timing is None or timing.active:
+            return super().to_representation(instance)
+        with timing.measure('serialize'):
+            return super().to_representation(instance)
+
+
+class ServerTimingMixin:
+    """
+    Add a ``Server-Timing`` header with the phases of the request.
+
+    Enabled by ``API_SERVER_TIMING``. Authentication and permission checks
+    are timed around the DRF hooks, serialization by
+    ``TimedSerializerMixin`` and ``CompiledSerializer``, and rendering from
+    ``finalize_response`` until the post-render callback. Streamed bodies
+    are produced after the header is sent and are not included.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        if settings.API_SERVER_TIMING:
+            self.server_timing = ServerTiming()
+            self.server_timing_token = server_timing.set(self.server_timing)
+        super().initial(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with measure('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with measure('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with measure('perm'):
+            super().check_object_permissions(request, obj)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        timing = getattr(self, 'server_timing', None)
+        if timing is None:
+            return response
+        server_timing.reset(self.server_timing_token)
+        timing.stop_view()
+        if getattr(response, 'is_rendered', True):
+            timing.finish(response)
+        else:
+            response.add_post_render_callback(
+                partial(timing.finish, render_started=perf_counter())
+            )
+        return response
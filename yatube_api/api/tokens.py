@@ -0,0 +1,116 @@
+from hashlib import sha256
+from time import time
+
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+from .lru import ExpiringLRUCache
+from .revocation import revoked_tokens
+
+REVOKED_MESSAGE = 'Токен отозван.'
+
+verified_tokens = ExpiringLRUCache(settings.API_TOKEN_CACHE_SIZE)
+
+
+def token_key(raw_token):
+    """Return the cache key of a token: its SHA-256 digest."""
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return sha256(raw_token).digest()
+
+
+def get_verified_payload(raw_token):
+    """Return claims of a token verified before, ``None`` otherwise."""
+    return verified_tokens.get(token_key(raw_token))
+
+
+def remember_payload(raw_token, payload):
+    """Keep claims of a freshly verified token until its ``exp``."""
+    verified_tokens.set(
+        token_key(raw_token), payload, payload['exp'] - time()
+    )
+
+
+def forget_token(raw_token):
+    verified_tokens.pop(token_key(raw_token))
+
+
+def token_from_payload(token_class, raw_token, payload):
+    """
+    Build a token object from cached claims without decoding the token.
+
+    Mirrors the state ``Token.__init__`` leaves after a successful decode.
+    """
+    token = token_class.__new__(token_class)
+    token.token = raw_token
+    token.current_time = aware_utcnow()
+    token.payload = dict(payload)
+    return token
+
+
+def verify_token(raw_token):
+    """
+    Verify a token of any type, decoding it only on the first call.
+
+    Raises:
+        TokenError: If the token is invalid, expired or revoked.
+    """
+    payload = get_verified_payload(raw_token)
+    if payload is None:
+        payload = UntypedToken(raw_token).payload
+        remember_payload(raw_token, payload)
+    check_revoked(payload)
+    return payload
+
+
+def check_revoked(payload):
+    """
+    Raise ``TokenError`` if the token with ``payload`` is revoked.
+
+    Tokens without a ``jti`` claim cannot be revoked.
+    """
+    jti = payload.get(api_settings.JTI_CLAIM)
+    if jti is not None and revoked_tokens.is_revoked(jti):
+        raise TokenError(REVOKED_MESSAGE)
+
+
+def revoke_token(raw_token):
+    """
+    Revoke a valid token of any type until it expires.
+
+    Raises:
+        TokenError: If the token is invalid, expired or already revoked.
+    """
+    payload = verify_token(raw_token)
+    revoked_tokens.revoke(
+        payload[api_settings.JTI_CLAIM],
+        datetime_from_epoch(payload['exp']),
+    )
+    forget_token(raw_token)
+
+
+def refresh_token(raw_token):
+    """
+    Return a refresh token object, rejecting revoked tokens.
+
+    Raises:
+        TokenError: If the token is invalid, expired or revoked.
+    """
+    token = RefreshToken(raw_token)
+    check_revoked(token.payload)
+    return token
+
+
+def cached_token(raw_token, token_classes):
+    """Return a token of one of ``token_classes`` from the cache, if any."""
+    payload = get_verified_payload(raw_token)
+    if payload is None:
+        return None
+    token_type = payload.get(api_settings.TOKEN_TYPE_CLAIM)
+    for token_class in token_classes:
+        if token_class.token_type == token_type:
+            return token_from_payload(token_class, raw_token, payload)
+    return None
@@ -1,12 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import (PostViewSet, CommentViewSet, FollowViewSet,
-                    GroupViewSet)
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-    TokenVerifyView,
-)
+from .views import (PostViewSet, CommentViewSet, FeedViewSet, FollowViewSet,
+                    GroupViewSet, CachedTokenVerifyView,
+                    RevocableTokenRefreshView, ThrottledTokenObtainPairView,
+                    TokenRevokeView)
 router = DefaultRouter()
 
 # Регистрация маршрутов
@@ -15,6 +12,7 @@ router.register(r'posts/(?P<post_id>\d+)/comments', CommentViewSet,
                 basename='comments')
 router.register(r'follow', FollowViewSet, basename='follow')
 router.register(r'groups', GroupViewSet, basename='group')
+router.register(r'feed', FeedViewSet, basename='feed')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -22,9 +20,12 @@ urlpatterns = [
 
 
 urlpatterns += [
-    path('jwt/create/', TokenObtainPairView.as_view(),
+    path('jwt/create/', ThrottledTokenObtainPairView.as_view(),
          name='token_obtain_pair'),
-    path('jwt/refresh/', TokenRefreshView.as_view(),
+    path('jwt/refresh/', RevocableTokenRefreshView.as_view(),
          name='token_refresh'),
-    path('jwt/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('jwt/verify/', CachedTokenVerifyView.as_view(),
+         name='token_verify'),
+    path('jwt/revoke/', TokenRevokeView.as_view(),
+         name='token_revoke'),
 ]
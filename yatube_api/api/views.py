@@ -1,39 +1,122 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
+from rest_framework.mixins import ListModelMixin
+from rest_framework_simplejwt.views import (TokenObtainPairView,
+                                            TokenRefreshView, TokenVerifyView,
+                                            TokenViewBase)
+from rest_framework.viewsets import (GenericViewSet, ModelViewSet,
+                                     ReadOnlyModelViewSet)
 from posts.models import Post, Comment, Follow, Group
-from .serializers import (PostSerializer, CommentSerializer,
-                          FollowSerializer, GroupSerializer)
+from posts.images import get_variant, schedule_variants
+from posts.search import search_follows, search_posts
+from posts.timeline import (backfill_timeline, fan_out_post, fan_out_posts,
+                            feed_queryset, trim_timeline, update_popularity)
+from .serializers import (PostSerializer, PostSearchSerializer,
+                          CommentSerializer, FollowSerializer,
+                          GroupSerializer, CachedTokenVerifySerializer,
+                          RevocableTokenRefreshSerializer,
+                          TokenRevokeSerializer)
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.permissions import IsAuthenticated
 from .permissions import IsAuthorOrReadOnly
+from .batch import BatchCreateMixin, bulk_create_with_ids
+from .fast import FastListMixin
+from .streaming import StreamingListMixin
+from .throttling import LoginRateThrottle
+from .timing import ServerTimingMixin
+from .cache import (CachedResponseMixin, GROUPS, POSTS, USERS,
+                    bump_generations, comments_generation, post_generation)
 from rest_framework.exceptions import PermissionDenied
-from .paginators import PostPagination
-from rest_framework.filters import SearchFilter
-from django.db.models import Q
-from rest_framework.response import Response
+from .paginators import FeedPagination, PostPagination
 
 
-class PostViewSet(ModelViewSet):
+class PostViewSet(ServerTimingMixin, BatchCreateMixin, CachedResponseMixin,
+                  FastListMixin, StreamingListMixin, ModelViewSet):
     """ViewSet for managing posts."""
 
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author').order_by(
+        *PostPagination.ordering
+    )
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    read_from_replica = True
+    async_reads = True
     pagination_class = PostPagination
+    stream_ordering = PostPagination.ordering
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        # Пытаемся применить пагинацию
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get_search_query(self):
+        """Return the full-text query of a list request, if any."""
+        if self.action != 'list':
+            return None
+        return self.request.query_params.get('search')
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.get_search_query()
+        if query is not None:
+            queryset = search_posts(queryset, query)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.get_search_query() is not None:
+            return PostSearchSerializer
+        return super().get_serializer_class()
 
+    def get_cache_generations(self):
+        if self.action == 'retrieve':
+            return [post_generation(self.kwargs['pk']), GROUPS, USERS]
+        return [POSTS, GROUPS, USERS]
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        fan_out_post(post)
+        schedule_variants(post)
+
+    def perform_update(self, serializer):
+        if 'image' in serializer.validated_data:
+            serializer.validated_data['image_variants'] = {}
+        post = serializer.save()
+        if 'image' in serializer.validated_data:
+            schedule_variants(post)
+
+    @action(detail=True, methods=['get'],
+            url_path=r'image/(?P<variant>\w+)', url_name='image-variant')
+    def image_variant(self, request, pk=None, variant=None):
+        """
+        Redirect to a variant of the post image, rendering it if needed.
+
+        An image that is missing or cannot be read gives 404.
+        """
+        post = self.get_object()
+        if not post.image or variant not in settings.POST_IMAGE_VARIANTS:
+            raise Http404
+        try:
+            name = get_variant(post, variant)
+        except OSError:
+            # Файла нет или он не читается как изображение
+            # (UnidentifiedImageError - тоже OSError).
+            raise Http404
+        return HttpResponseRedirect(post.image.storage.url(name))
+
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """Create up to ``API_BATCH_MAX_SIZE`` posts in one request."""
+        return self.batch_create(request)
+
+    def get_batch_instance(self, validated_data):
+        return Post(author=self.request.user, **validated_data)
+
+    def perform_batch_create(self, objects):
+        # bulk_create не отправляет сигналы, поэтому рассылка по лентам и
+        # сброс кеша выполняются явно.
+        bulk_create_with_ids(Post, objects)
+        fan_out_posts(self.request.user, objects)
+        bump_generations(POSTS)
 
     def destroy(self, request, *args, **kwargs):
         post = self.get_object()
@@ -42,7 +125,9 @@ class PostViewSet(ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ServerTimingMixin, BatchCreateMixin,
+                     CachedResponseMixin, FastListMixin, StreamingListMixin,
+                     ModelViewSet):
     """
     ViewSet for managing comments.
 
@@ -59,18 +144,26 @@ class CommentViewSet(ModelViewSet):
 
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    read_from_replica = True
+    async_reads = True
 
     def get_queryset(self):
         """
         Retrieve the queryset of comments for a specific post.
 
-        Filters comments by the `post_id` parameter in the URL.
+        Filters comments by the `post_id` parameter in the URL and orders
+        them oldest first, along the ``(post, created)`` index.
 
         Returns:
             QuerySet: A queryset containing comments for the specified post.
         """
         post_id = self.kwargs['post_id']
-        return Comment.objects.filter(post_id=post_id)
+        return Comment.objects.filter(
+            post_id=post_id
+        ).select_related('author').order_by('created', 'id')
+
+    def get_cache_generations(self):
+        return [comments_generation(self.kwargs['post_id']), USERS]
 
     def perform_create(self, serializer):
         """
@@ -89,35 +182,48 @@ class CommentViewSet(ModelViewSet):
         post_id = self.kwargs['post_id']
         serializer.save(author=self.request.user, post_id=post_id)
 
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request, post_id=None):
+        """Create up to ``API_BATCH_MAX_SIZE`` comments in one request."""
+        self.batch_post = get_object_or_404(Post, pk=post_id)
+        return self.batch_create(request)
+
+    def get_batch_instance(self, validated_data):
+        return Comment(
+            author=self.request.user, post=self.batch_post, **validated_data
+        )
+
+    def perform_batch_create(self, objects):
+        bulk_create_with_ids(Comment, objects)
+        bump_generations(comments_generation(self.batch_post.pk))
+
 
-class FollowViewSet(ModelViewSet):
+class FollowViewSet(ServerTimingMixin, StreamingListMixin, ModelViewSet):
     """
     ViewSet for managing follows.
     Only authenticated users can access this endpoint.
     """
 
-    queryset = Follow.objects.all()
+    queryset = Follow.objects.select_related('user', 'following')
     serializer_class = FollowSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [SearchFilter]
-    search_fields = ['following__username']
+    read_from_replica = True
 
     def get_queryset(self):
         """
-        Optionally restricts the returned follows to a filtered subset.
+        Return follows of the authenticated user.
 
-        based on query parameters.
+        The ``search`` parameter keeps follows whose username starts with
+        the given prefix; the lookup is a range scan over the
+        ``(user, following_username)`` index.
         """
-        queryset = super().get_queryset()
-        following_username = (
-            self.request.query_params.get('search', None)
-        )
-        if following_username:
-            queryset = queryset.filter(
-                Q(following__username__icontains=following_username)
-            )
-
-        return queryset.filter(user=self.request.user)
+        queryset = super().get_queryset().filter(
+            user=self.request.user
+        ).order_by('-created', '-id')
+        prefix = self.request.query_params.get('search')
+        if prefix:
+            queryset = search_follows(queryset, prefix)
+        return queryset
 
     def perform_create(self, serializer):
         """
@@ -134,13 +240,70 @@ class FollowViewSet(ModelViewSet):
         if Follow.objects.filter(user=user, following=following).exists():
             raise ValidationError("Вы уже подписаны на этого пользователя.")
 
-        # Создаем новую подписку
-        serializer.save(user=user)
+        # Создаем новую подписку и добавляем посты автора в ленту
+        with transaction.atomic():
+            serializer.save(user=user)
+            backfill_timeline(user, following)
+            update_popularity(following)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Delete the follow and drop the author's posts from the feed."""
+        trim_timeline(instance.user, instance.following)
+        instance.delete()
+        update_popularity(instance.following)
 
-class GroupViewSet(ReadOnlyModelViewSet):
+
+class FeedViewSet(ServerTimingMixin, ListModelMixin, GenericViewSet):
+    """
+    ViewSet for the home feed of the authenticated user.
+
+    Lists posts of the authors the user follows, newest first.
+    """
+
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
+
+    def get_queryset(self):
+        """Return the requested page of the authenticated user's feed."""
+        cursor, limit = self.paginator.get_feed_page(self.request)
+        return feed_queryset(self.request.user, cursor, limit)
+
+
+class GroupViewSet(ServerTimingMixin, CachedResponseMixin, FastListMixin,
+                   StreamingListMixin, ReadOnlyModelViewSet):
     """ViewSet for managing groups."""
 
-    queryset = Group.objects.all()
+    queryset = Group.objects.order_by('id')
     serializer_class = GroupSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    read_from_replica = True
+    async_reads = True
+
+    def get_cache_generations(self):
+        return [GROUPS]
+
+
+class CachedTokenVerifyView(ServerTimingMixin, TokenVerifyView):
+    """Token verification backed by the verified token cache."""
+
+    serializer_class = CachedTokenVerifySerializer
+
+
+class ThrottledTokenObtainPairView(ServerTimingMixin, TokenObtainPairView):
+    """Token obtain limited by the ``login`` scope per IP address."""
+
+    throttle_classes = (LoginRateThrottle,)
+
+
+class RevocableTokenRefreshView(ServerTimingMixin, TokenRefreshView):
+    """Token refresh that rejects revoked refresh tokens."""
+
+    serializer_class = RevocableTokenRefreshSerializer
+
+
+class TokenRevokeView(ServerTimingMixin, TokenViewBase):
+    """Revoke the passed access or refresh token."""
+
+    serializer_class = TokenRevokeSerializer
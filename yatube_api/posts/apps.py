@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_triggers
+        from .sqlite import configure_connection
+        post_migrate.connect(ensure_triggers, sender=self)
+        connection_created.connect(configure_connection)
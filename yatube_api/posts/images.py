@@ -0,0 +1,146 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from .models import Post
+
+VARIANTS_DIR = 'posts/variants'
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_executor():
+    """Return the process-wide worker pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POST_IMAGE_WORKERS,
+                thread_name_prefix='post-images',
+            )
+    return _executor
+
+
+def variant_name(image_name, variant):
+    """Return the storage name of a variant of ``image_name``."""
+    stem, ext = posixpath.splitext(posixpath.basename(image_name))
+    return f'{VARIANTS_DIR}/{stem}_{variant}{ext.lower()}'
+
+
+def make_variant(post, variant):
+    """
+    Render one size variant of the post image and save it to storage.
+
+    The longest side of the image is reduced to the width configured for
+    the variant in ``POST_IMAGE_VARIANTS``; smaller images are not scaled
+    up.
+
+    Args:
+        post (Post): A post with an image.
+        variant (str): Name of the variant.
+
+    Returns:
+        str: Storage name of the variant file.
+    """
+    size = settings.POST_IMAGE_VARIANTS[variant]
+    storage = post.image.storage
+    name = variant_name(post.image.name, variant)
+    with storage.open(post.image.name) as source:
+        image = Image.open(source)
+        image_format = image.format or 'JPEG'
+        image.thumbnail((size, size))
+        buffer = BytesIO()
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(buffer, format=image_format)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def save_variants(post, variants):
+    """
+    Store ready variants unless the post image was replaced meanwhile.
+
+    Args:
+        post (Post): The post the variants were rendered for.
+        variants (dict): Variant names mapped to storage names.
+    """
+    post.image_variants = {**post.image_variants, **variants}
+    Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image_variants=post.image_variants
+    )
+
+
+def generate_variants(post_id):
+    """Render all missing variants of a post image; runs in the pool."""
+    close_old_connections()
+    try:
+        post = Post.objects.filter(pk=post_id).first()
+        if post is None or not post.image:
+            return
+        save_variants(post, {
+            variant: make_variant(post, variant)
+            for variant in settings.POST_IMAGE_VARIANTS
+            if variant not in post.image_variants
+        })
+    finally:
+        close_old_connections()
+
+
+def log_failure(post_id, future):
+    """Log an error raised while rendering variants in the pool."""
+    error = future.exception()
+    if error is not None:
+        logger.error(
+            'Не удалось подготовить варианты изображения поста %s',
+            post_id, exc_info=error,
+        )
+
+
+def submit_variants(post_id):
+    """Queue ``generate_variants`` in the pool, logging its failure."""
+    future = get_executor().submit(generate_variants, post_id)
+    future.add_done_callback(partial(log_failure, post_id))
+
+
+def schedule_variants(post):
+    """
+    Queue variant rendering once the current transaction commits.
+
+    With ``POST_IMAGE_WORKERS = 0`` the variants are rendered right after
+    the commit in the calling thread.
+    """
+    if not post.image:
+        return
+    if settings.POST_IMAGE_WORKERS:
+        transaction.on_commit(lambda: submit_variants(post.pk))
+    else:
+        transaction.on_commit(lambda: generate_variants(post.pk))
+
+
+def get_variant(post, variant):
+    """
+    Return the storage name of a variant, rendering it if not ready yet.
+
+    Args:
+        post (Post): A post with an image.
+        variant (str): Name of the variant.
+
+    Returns:
+        str: Storage name of the variant file.
+    """
+    if variant not in post.image_variants:
+        save_variants(post, {variant: make_variant(post, variant)})
+    return post.image_variants[variant]
@@ -0,0 +1,137 @@
+import json
+import multiprocessing
+import random
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from posts.models import Post
+from posts.sqlite import use_database
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def run_worker(path, profile, seconds, write_ratio, seed, results):
+    use_database(path, profile)
+    rng = random.Random(seed)
+    author = User.objects.get(username='bench_author')
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    deadline = perf_counter() + seconds
+    while perf_counter() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                Post.objects.create(author=author, text='bench')
+                counts['writes'] += 1
+            else:
+                list(
+                    Post.objects.select_related('author')
+                    .order_by('-pub_date')[:10]
+                )
+                counts['reads'] += 1
+        except OperationalError:
+            # "database is locked": писатель не дождался освобождения базы.
+            counts['errors'] += 1
+    connections.close_all()
+    results.put(counts)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite с разными профилями '
+        'PRAGMA при параллельных читателях и писателях. Каждый профиль '
+        'проверяется на отдельной временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество параллельных процессов.',
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Длительность замера для каждого профиля.',
+        )
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.2,
+            help='Доля операций записи.',
+        )
+        parser.add_argument(
+            '--rows', type=int, default=10_000,
+            help='Количество постов в базе перед замером.',
+        )
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(settings.SQLITE_PROFILES),
+            help='Сравниваемые профили из SQLITE_PROFILES.',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 0 or options['seconds'] <= 0:
+            raise CommandError(
+                '--workers и --seconds должны быть положительными.'
+            )
+        unknown = set(options['profiles']) - set(settings.SQLITE_PROFILES)
+        if unknown:
+            raise CommandError(f'Неизвестные профили: {", ".join(unknown)}')
+
+        original = (
+            connections['default'].settings_dict['NAME'],
+            settings.SQLITE_PROFILE,
+        )
+        results = []
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for profile in options['profiles']:
+                    path = str(Path(directory) / f'{profile}.sqlite3')
+                    self.prepare(path, profile, options['rows'])
+                    results.append(self.measure(path, profile, options))
+        finally:
+            use_database(*original)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def prepare(self, path, profile, rows):
+        use_database(path, profile)
+        call_command('migrate', verbosity=0)
+        author = User.objects.create(username='bench_author')
+        Post.objects.bulk_create(
+            (Post(author=author, text=f'Пост {i}') for i in range(rows)),
+            batch_size=BATCH_SIZE,
+        )
+        # Процессы-потомки не должны унаследовать открытое соединение.
+        connections.close_all()
+
+    def measure(self, path, profile, options):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        workers = [
+            context.Process(target=run_worker, args=(
+                path, profile, options['seconds'], options['write_ratio'],
+                seed, queue,
+            ))
+            for seed in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        counts = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        total = {
+            key: sum(item[key] for item in counts)
+            for key in ('reads', 'writes', 'errors')
+        }
+        return {
+            'profile': profile,
+            'workers': options['workers'],
+            'reads_per_second': round(total['reads'] / options['seconds']),
+            'writes_per_second': round(
+                total['writes'] / options['seconds']
+            ),
+            'errors': total['errors'],
+        }
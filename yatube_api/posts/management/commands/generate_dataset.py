@@ -0,0 +1,281 @@
+import random
+from array import array
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post, Timeline
+from posts.timeline import deliver_history, update_popularity
+
+User = get_user_model()
+
+WORDS = (
+    'день город утро дом друг книга работа море вечер дорога музыка кот '
+    'солнце лето зима весна осень снег дождь река лес поле небо звезда '
+    'новость проект идея вопрос ответ история фото чай кофе поезд сад'
+).split()
+
+
+def skewed_index(rng, size, skew):
+    """Return an index in ``range(size)``; small indices are more likely."""
+    return min(size - 1, int(size * rng.random() ** skew))
+
+
+def make_text(rng, min_words, max_words):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize() + '.'
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Let ``bulk_create`` keep the given ``auto_now_add`` values."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, группами, постами, '
+        'комментариями и подписками с неравномерным распределением: у '
+        'немногих авторов много постов и подписчиков. Данные создаются '
+        'пакетами через bulk_create и полностью определяются --seed; '
+        'прерванный запуск продолжается с первого незавершённого пакета. '
+        'В конце посты рассылаются по лентам подписчиков.'
+    )
+
+    stages = ('users', 'groups', 'posts', 'comments', 'follows', 'timelines')
+
+    def add_arguments(self, parser):
+        for name, default in (('users', 10_000), ('groups', 100),
+                              ('posts', 100_000), ('comments', 300_000),
+                              ('follows', 200_000)):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Количество записей: {name}.',
+            )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument(
+            '--skew', type=float, default=3.0,
+            help='Степень неравномерности распределений, 1 - равномерно.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней распределены публикации.',
+        )
+        parser.add_argument(
+            '--prefix', default='ds',
+            help='Префикс имён пользователей и слагов групп набора.',
+        )
+        parser.add_argument(
+            '--password',
+            help='Общий пароль пользователей; по умолчанию вход запрещён.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0 or options['skew'] < 1:
+            raise CommandError('--batch-size > 0 и --skew >= 1.')
+        if min(options['users'], options['days']) <= 0:
+            raise CommandError('--users и --days должны быть положительными.')
+        self.options = options
+        self.prefix = options['prefix']
+        self.now = timezone.now()
+        self.span = timedelta(days=options['days'])
+        for stage in self.stages:
+            getattr(self, f'create_{stage}')()
+
+    def rng(self, stage, batch):
+        # Пакет зависит только от seed, этапа и номера - не от прошлых.
+        return random.Random(f'{self.options["seed"]}:{stage}:{batch}')
+
+    def run_batches(self, stage, total, done, build, model):
+        batch_size = self.options['batch_size']
+        # Пакеты атомарны, поэтому done кратно размеру пакета или равно total.
+        for batch in range(-(-done // batch_size), -(-total // batch_size)):
+            start = batch * batch_size
+            stop = min(total, start + batch_size)
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    build(self.rng(stage, batch), start, stop),
+                    batch_size=batch_size,
+                )
+            if self.options['verbosity'] > 1:
+                self.stdout.write(f'{stage}: {stop}/{total}')
+
+    def report(self, stage, queryset):
+        self.stdout.write(f'{stage}: {queryset.count()}')
+
+    def username(self, index):
+        return f'{self.prefix}_user_{index}'
+
+    def dataset_users(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}_user_')
+
+    def index_ids(self, queryset, name_field):
+        """Return an array mapping dataset indices to primary keys."""
+        ids = array('q')
+        for pk, name in queryset.values_list('pk', name_field).iterator():
+            index = int(name.rsplit('_', 1)[1])
+            if index >= len(ids):
+                ids.extend([0] * (index + 1 - len(ids)))
+            ids[index] = pk
+        return ids
+
+    def create_users(self):
+        # Один хеш на всех пользователей: PBKDF2 на каждого слишком долог.
+        password = make_password(self.options['password'])
+
+        def build(rng, start, stop):
+            return (
+                User(username=self.username(i), password=password)
+                for i in range(start, stop)
+            )
+        self.run_batches(
+            'users', self.options['users'], self.dataset_users().count(),
+            build, User,
+        )
+        self.report('users', self.dataset_users())
+        self.user_ids = self.index_ids(self.dataset_users(), 'username')
+
+    def create_groups(self):
+        groups = Group.objects.filter(slug__startswith=f'{self.prefix}_group_')
+
+        def build(rng, start, stop):
+            return (
+                Group(title=make_text(rng, 1, 3),
+                      slug=f'{self.prefix}_group_{i}',
+                      description=make_text(rng, 5, 20))
+                for i in range(start, stop)
+            )
+        self.run_batches(
+            'groups', self.options['groups'], groups.count(), build, Group
+        )
+        self.report('groups', groups)
+        self.group_ids = self.index_ids(groups, 'slug')
+
+    def post_date(self, index):
+        """Publication dates grow with the post index, like ids do."""
+        fraction = index / max(self.options['posts'], 1)
+        return self.now - self.span * (1 - fraction)
+
+    def create_posts(self):
+        posts = Post.objects.filter(author__in=self.dataset_users())
+        skew = self.options['skew']
+
+        def build(rng, start, stop):
+            for i in range(start, stop):
+                group = None
+                if self.group_ids and rng.random() < 0.6:
+                    group = self.group_ids[
+                        skewed_index(rng, len(self.group_ids), skew)
+                    ]
+                yield Post(
+                    author_id=self.user_ids[
+                        skewed_index(rng, len(self.user_ids), skew)
+                    ],
+                    group_id=group,
+                    text=make_text(rng, 5, 60),
+                    pub_date=self.post_date(i),
+                )
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            self.run_batches(
+                'posts', self.options['posts'], posts.count(), build, Post
+            )
+        self.report('posts', posts)
+        self.post_ids = array('q', posts.order_by('pk').values_list(
+            'pk', flat=True
+        ).iterator())
+
+    def create_comments(self):
+        comments = Comment.objects.filter(author__in=self.dataset_users())
+        if not self.post_ids:
+            return
+        skew = self.options['skew']
+
+        def build(rng, start, stop):
+            for _ in range(start, stop):
+                # Обсуждают в основном первые, самые популярные посты.
+                index = skewed_index(rng, len(self.post_ids), skew)
+                posted = self.post_date(index)
+                yield Comment(
+                    author_id=self.user_ids[
+                        rng.randrange(len(self.user_ids))
+                    ],
+                    post_id=self.post_ids[index],
+                    text=make_text(rng, 2, 30),
+                    created=posted + (self.now - posted) * rng.random(),
+                )
+        with explicit_dates(Comment._meta.get_field('created')):
+            self.run_batches(
+                'comments', self.options['comments'], comments.count(),
+                build, Comment,
+            )
+        self.report('comments', comments)
+
+    def create_follows(self):
+        """
+        Give every user an exponentially distributed number of followees.
+
+        Batches cover blocks of followers, so the follower of the last
+        inserted row tells where an interrupted run stopped.
+        """
+        users = len(self.user_ids)
+        if users < 2 or self.options['follows'] <= 0:
+            return
+        mean = max(self.options['follows'] / users, 1e-9)
+        skew = self.options['skew']
+
+        def build(rng, start, stop):
+            for follower in range(start, stop):
+                count = min(users - 1, int(rng.expovariate(1 / mean)))
+                followees = set()
+                while len(followees) < count:
+                    index = skewed_index(rng, users, skew)
+                    if index != follower:
+                        followees.add(index)
+                for index in sorted(followees):
+                    yield Follow(
+                        user_id=self.user_ids[follower],
+                        following_id=self.user_ids[index],
+                        following_username=self.username(index).lower(),
+                        created=self.now - self.span * rng.random(),
+                    )
+        follows = Follow.objects.filter(user__in=self.dataset_users())
+        last = follows.order_by('-pk').values_list(
+            'user__username', flat=True
+        ).first()
+        done = 0
+        if last is not None:
+            batch_size = self.options['batch_size']
+            done = (int(last.rsplit('_', 1)[1]) // batch_size + 1) * batch_size
+        with explicit_dates(Follow._meta.get_field('created')):
+            self.run_batches('follows', users, done, build, Follow)
+        self.report('follows', follows)
+
+    def create_timelines(self):
+        """
+        Fan out the bulk-created posts as if they came through the API.
+
+        Popular authors are marked for pull at read time, the others get
+        their latest posts delivered to the followers' timelines.
+        """
+        authors = self.dataset_users().filter(
+            posts__fanned_out=False
+        ).distinct()
+        for author in authors.iterator():
+            with transaction.atomic():
+                if not update_popularity(author):
+                    deliver_history(author)
+        self.report(
+            'timelines', Timeline.objects.filter(user__in=self.dataset_users())
+        )
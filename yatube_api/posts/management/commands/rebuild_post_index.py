@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов с нуля.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество постов в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Индекс FTS5 доступен только для SQLite.')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size должен быть положительным.')
+        indexed = rebuild_index(options['batch_size'], stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f'Индекс перестроен, постов: {indexed}')
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:12
+
+from django.db import migrations, models
+
+
+def fill_following_username(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    for follow in Follow.objects.select_related('following').iterator():
+        follow.following_username = follow.following.username.lower()
+        follow.save(update_fields=['following_username'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='following_username',
+            field=models.CharField(default='', editable=False, help_text='Lowercased username of the followed user.', max_length=150),
+        ),
+        migrations.RunPython(
+            fill_following_username, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', 'following_username'], name='follow_user_username_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:02
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+import django.db.models.deletion
+
+BATCH_SIZE = 1_000
+
+
+def fill_timeline_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Timeline = apps.get_model('posts', 'Timeline')
+    Timeline.objects.update(pub_date=Subquery(
+        Post.objects.filter(pk=OuterRef('post_id')).values('pub_date')[:1]
+    ))
+
+
+def fan_out_existing_posts(apps, schema_editor):
+    """
+    Mark popular authors and deliver the posts written before fan-out.
+
+    Each follower gets the latest ``FEED_BACKFILL_SIZE`` posts of a
+    followed author, as after a new follow, and every post of a
+    non-popular author is marked as fanned out.
+    """
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    PopularAuthor = apps.get_model('posts', 'PopularAuthor')
+    Timeline = apps.get_model('posts', 'Timeline')
+    popular = set(
+        Follow.objects.order_by().values('following').annotate(
+            followers=Count('pk')
+        ).filter(
+            followers__gte=settings.FEED_FANOUT_MAX_FOLLOWERS
+        ).values_list('following', flat=True)
+    )
+    PopularAuthor.objects.bulk_create(
+        (PopularAuthor(author_id=author_id) for author_id in popular),
+        ignore_conflicts=True,
+    )
+    authors = set(
+        Post.objects.filter(fanned_out=False).order_by().values_list(
+            'author_id', flat=True
+        ).distinct()
+    ) - popular
+    for author_id in authors:
+        pending = Post.objects.filter(author_id=author_id, fanned_out=False)
+        posts = list(pending.order_by('-pub_date', '-id').values_list(
+            'id', 'pub_date'
+        )[:settings.FEED_BACKFILL_SIZE])
+        followers = Follow.objects.filter(
+            following_id=author_id
+        ).values_list('user_id', flat=True)
+        Timeline.objects.bulk_create(
+            (Timeline(user_id=user_id, post_id=post_id, pub_date=pub_date)
+             for user_id in followers.iterator()
+             for post_id, pub_date in posts),
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+        pending.update(fanned_out=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularAuthor',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='timeline',
+            name='pub_date',
+            field=models.DateTimeField(null=True, verbose_name='Дата публикации'),
+        ),
+        migrations.RunPython(
+            fill_timeline_pub_date, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='timeline',
+            name='pub_date',
+            field=models.DateTimeField(verbose_name='Дата публикации'),
+        ),
+        migrations.AddIndex(
+            model_name='timeline',
+            index=models.Index(fields=['user', 'pub_date', 'post'], name='timeline_user_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            fan_out_existing_posts, migrations.RunPython.noop
+        ),
+    ]
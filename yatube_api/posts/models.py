@@ -37,7 +37,12 @@ class Post(models.Model):
         text: The content of the post.
         pub_date: The date and time when the post was published.
         image: An optional image attached to the post.
+        image_variants: Ready size variants of the image, mapping variant
+            names from ``settings.POST_IMAGE_VARIANTS`` to storage names.
         group: An optional group to which the post belongs.
+        fanned_out: Whether the post was pushed into followers' timelines.
+            Posts of popular authors are not fanned out and are pulled into
+            the feed at read time instead.
     """
 
     text = models.TextField()
@@ -46,8 +51,32 @@ class Post(models.Model):
         User, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(
         upload_to='posts/', null=True, blank=True)
+    image_variants = models.JSONField(default=dict, editable=False)
     group = models.ForeignKey(Group, on_delete=models.SET_NULL, blank=True,
                               null=True, related_name="posts")
+    fanned_out = models.BooleanField(
+        'Разослан по лентам', default=False, editable=False)
+
+    class Meta:
+        """
+        Meta options for the Post model.
+
+        Posts are listed newest first. The indexes match the lists of all
+        posts, of an author's posts and of a group's posts by date.
+        """
+
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'], name='post_pub_date_id_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'], name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', 'pub_date'], name='post_group_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         """
@@ -79,6 +108,21 @@ class Comment(models.Model):
     created = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
 
+    class Meta:
+        """
+        Meta options for the Comment model.
+
+        Comments of a post are listed oldest first, straight from the
+        ``(post, created)`` index.
+        """
+
+        ordering = ['created', 'id']
+        indexes = [
+            models.Index(
+                fields=['post', 'created'], name='comment_post_created_idx',
+            ),
+        ]
+
     def __str__(self):
         """
         Return a string representation of the comment instance.
@@ -97,6 +141,8 @@ class Follow(models.Model):
     Attributes:
         user (User): The user who is following.
         following (User): The user who is being followed.
+        following_username (str): Lowercased username of ``following``,
+            indexed together with ``user`` for prefix search.
         created (datetime): The date and time when the subscription
         was created.
     """
@@ -107,6 +153,10 @@ class Follow(models.Model):
     following = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='following'
     )
+    following_username = models.CharField(
+        max_length=150, default='', editable=False,
+        help_text='Lowercased username of the followed user.'
+    )
 
     created = models.DateTimeField(
         'Дата подписки', auto_now_add=True, db_index=True,
@@ -118,11 +168,26 @@ class Follow(models.Model):
         Meta options for the Follow model.
 
         Enforces unique subscription pairs and adds a constraint to prevent
-        self-subscription.
+        self-subscription. A user's follows are listed newest first from
+        the ``(user, created)`` index.
         """
 
         unique_together = ['user', 'following']
-        ordering = ['-created']
+        ordering = ['-created', '-id']
+        indexes = [
+            models.Index(
+                fields=['user', 'following_username'],
+                name='follow_user_username_idx',
+            ),
+            models.Index(
+                fields=['user', 'created'], name='follow_user_created_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Keep ``following_username`` in sync with the followed user."""
+        self.following_username = self.following.username.lower()
+        super().save(*args, **kwargs)
 
     def __str__(self):
         """
@@ -132,3 +197,78 @@ class Follow(models.Model):
             str: The username of the follower and the followed user.
         """
         return f"{self.user.username} follows {self.following.username}"
+
+
+class Timeline(models.Model):
+    """
+    Represent a post delivered to a follower's home feed.
+
+    Rows are written when a post is created (fan-out on write) and when a
+    user follows an author, and removed when the user unfollows.
+
+    Attributes:
+        user (User): The owner of the feed.
+        post (Post): The post delivered to the feed.
+        pub_date (datetime): A copy of the post's publication date, so that
+            a page of the feed is read from the ``(user, pub_date, post)``
+            index without joining posts.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        """
+        Meta options for the Timeline model.
+
+        Each post is delivered to a feed at most once.
+        """
+
+        unique_together = ['user', 'post']
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Return a string representation of the timeline entry.
+
+        Returns:
+            str: The feed owner and the post id.
+        """
+        return f"{self.user_id} <- {self.post_id}"
+
+
+class PopularAuthor(models.Model):
+    """
+    Mark an author with too many followers for fan-out on write.
+
+    Posts of these authors are not pushed into timelines and are pulled
+    into the feed at read time. The row is kept in sync with the follower
+    count by ``posts.timeline.update_popularity``.
+
+    Attributes:
+        author (User): The popular author.
+    """
+
+    author = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='popularity'
+    )
+
+    def __str__(self):
+        """
+        Return a string representation of the popular author.
+
+        Returns:
+            str: The id of the author.
+        """
+        return str(self.author_id)
@@ -0,0 +1,195 @@
+import re
+
+from django.db import connection, connections, transaction
+from django.utils.html import escape
+
+FTS_TABLE = 'posts_post_fts'
+# Совпадения отмечаются символами из области частного использования:
+# разметка добавляется только после экранирования текста поста.
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+SNIPPET_SQL = (
+    f"snippet({FTS_TABLE}, 0, '{MATCH_START}', '{MATCH_END}', '…', 16)"
+)
+
+# Триггеры синхронизации индекса. SQLite удаляет их при пересоздании
+# таблицы posts_post (так применяется, например, AddField), поэтому после
+# каждой миграции они создаются заново.
+TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON posts_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+]
+
+TOKEN_RE = re.compile(r'\w+')
+# Наибольший символ Юникода, верхняя граница диапазона для поиска по префиксу.
+MAX_CHAR = chr(0x10FFFF)
+
+
+def ensure_triggers(using='default', **kwargs):
+    """
+    Create the index sync triggers if they are missing.
+
+    Connected to ``post_migrate``; does nothing until the FTS table exists.
+    """
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        if FTS_TABLE not in conn.introspection.table_names(cursor):
+            return
+        for statement in TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+def build_match_query(query):
+    """
+    Convert user input into a safe FTS5 MATCH expression.
+
+    Every word is quoted so that FTS5 operators typed by a user cannot
+    break the query; the words are combined with AND.
+
+    Args:
+        query (str): Raw value of the ``search`` parameter.
+
+    Returns:
+        str: The MATCH expression, empty if the query has no words.
+    """
+    return ' '.join(f'"{token}"' for token in TOKEN_RE.findall(query))
+
+
+def highlight(snippet):
+    """
+    Render a snippet as HTML with the matched words wrapped in ``<b>``.
+
+    Args:
+        snippet (str | None): The snippet with ``MATCH_START`` and
+            ``MATCH_END`` markers around matches.
+
+    Returns:
+        str | None: The escaped snippet.
+    """
+    if snippet is None:
+        return None
+    return escape(snippet).replace(MATCH_START, '<b>').replace(
+        MATCH_END, '</b>'
+    )
+
+
+def search_posts(queryset, query):
+    """
+    Filter posts by a full-text query, best matches first.
+
+    Each post gets ``rank`` (bm25, lower is better) and ``snippet``
+    attributes; the snippet is raw text to be rendered by ``highlight``.
+
+    Args:
+        queryset (QuerySet): Posts to search in.
+        query (str): Raw value of the ``search`` parameter.
+
+    Returns:
+        QuerySet: Matching posts ordered by rank.
+    """
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        return queryset.filter(text__icontains=query).extra(
+            select={'rank': '0', 'snippet': 'NULL'}
+        ).order_by('-pub_date', '-id')
+    return queryset.extra(
+        select={'rank': f'bm25({FTS_TABLE})', 'snippet': SNIPPET_SQL},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = posts_post.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    ).order_by('rank', 'id')
+
+
+def search_follows(queryset, prefix):
+    """
+    Filter follows by a case-insensitive prefix of the followed username.
+
+    The prefix is turned into a half-open range over the lowercased
+    ``following_username`` column, which the database resolves with an
+    index seek instead of a ``LIKE '%...%'`` scan.
+
+    Args:
+        queryset (QuerySet): Follows of a single user.
+        prefix (str): Raw value of the ``search`` parameter.
+
+    Returns:
+        QuerySet: Follows whose username starts with ``prefix``.
+    """
+    prefix = prefix.lower()
+    return queryset.filter(
+        following_username__gte=prefix,
+        following_username__lt=prefix + MAX_CHAR,
+    )
+
+
+def rebuild_index(batch_size, stdout=None):
+    """
+    Rebuild the search index from ``posts_post`` in batches.
+
+    Every batch is committed separately so that the table is never locked
+    for the whole rebuild. Only posts that existed when the index was
+    cleared are read: newer ones are indexed by the triggers, and indexing
+    them again would leave a duplicate entry behind.
+
+    Args:
+        batch_size (int): Number of posts indexed per transaction.
+        stdout: Optional stream for progress messages.
+
+    Returns:
+        int: Number of indexed posts.
+    """
+    # Очистка держит блокировку записи: пост не появится между ней и
+    # чтением последнего id.
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+        )
+        cursor.execute('SELECT MAX(id) FROM posts_post')
+        max_id = cursor.fetchone()[0] or 0
+    last_id, indexed = 0, 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, text FROM posts_post WHERE id > %s AND id <= %s '
+                'ORDER BY id LIMIT %s',
+                [last_id, max_id, batch_size],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)', rows
+            )
+        last_id = rows[-1][0]
+        indexed += len(rows)
+        if stdout is not None:
+            stdout.write(f'Проиндексировано постов: {indexed}')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return indexed
@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Follow
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def sync_following_username(sender, instance, created, **kwargs):
+    """Propagate a renamed user to the follows that point at them."""
+    if created:
+        return
+    username = instance.username.lower()
+    Follow.objects.filter(following=instance).exclude(
+        following_username=username
+    ).update(following_username=username)
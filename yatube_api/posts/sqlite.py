@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def get_pragmas(profile=None):
+    """Return PRAGMA values of ``profile``, the configured one by default."""
+    return settings.SQLITE_PROFILES[profile or settings.SQLITE_PROFILE]
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Apply the SQLite profile to every new database connection.
+
+    Connected to ``connection_created``; connections to other engines are
+    left untouched.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def use_database(path, profile=None):
+    """
+    Point the default connection of this process to the file ``path``.
+
+    Used by benchmarks to work on a scratch database. Connections opened
+    later by other threads use the new file as well.
+    """
+    for connection in connections.all():
+        # close() бэкенда SQLite оставляет открытой базу в памяти, а она
+        # тоже должна смениться файлом.
+        BaseDatabaseWrapper.close(connection)
+    connections['default'].settings_dict['NAME'] = path
+    if profile is not None:
+        settings.SQLITE_PROFILE = profile
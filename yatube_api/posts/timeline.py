@@ -0,0 +1,233 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Follow, PopularAuthor, Post, Timeline
+
+# Сколько источников ленты объединяется в одном запросе: SQLite
+# ограничивает глубину выражения в WHERE тысячей уровней.
+FEED_SOURCES_PER_QUERY = 100
+
+
+def is_popular(author):
+    """
+    Check whether the author has too many followers for fan-out on write.
+
+    Args:
+        author (User): The author of a new post.
+
+    Returns:
+        bool: True if the author's posts should be pulled at read time.
+    """
+    return Follow.objects.filter(following=author).count() >= (
+        settings.FEED_FANOUT_MAX_FOLLOWERS
+    )
+
+
+def update_popularity(author):
+    """
+    Bring the ``PopularAuthor`` row of the author in line with followers.
+
+    An author who is no longer popular gets the pending posts delivered by
+    ``deliver_history``, because the feed stops pulling them.
+
+    Args:
+        author (User): The author whose follower count may have changed.
+
+    Returns:
+        bool: True if the author is popular.
+    """
+    if is_popular(author):
+        PopularAuthor.objects.get_or_create(author=author)
+        return True
+    deleted, _ = PopularAuthor.objects.filter(author=author).delete()
+    if deleted:
+        deliver_history(author)
+    return False
+
+
+def fan_out_post(post):
+    """
+    Push a new post into the timelines of all followers of its author.
+
+    Posts of popular authors are left with ``fanned_out=False`` and are
+    pulled into the feed by ``feed_queryset``.
+
+    Args:
+        post (Post): The freshly created post.
+    """
+    fan_out_posts(post.author, [post])
+
+
+def fan_out_posts(author, posts):
+    """
+    Push several new posts of one author into their followers' timelines.
+
+    Args:
+        author (User): The author of all ``posts``.
+        posts (list[Post]): Freshly created posts with primary keys set.
+    """
+    if not posts or update_popularity(author):
+        return
+    deliver(author, posts)
+    for post in posts:
+        post.fanned_out = True
+
+
+def deliver(author, posts):
+    """Write timeline rows of ``posts`` and mark them as fanned out."""
+    followers = list(
+        Follow.objects.filter(following=author).values_list(
+            'user_id', flat=True
+        )
+    )
+    Timeline.objects.bulk_create(
+        (Timeline(user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+         for post in posts for user_id in followers),
+        ignore_conflicts=True,
+    )
+    Post.objects.filter(
+        pk__in=[post.pk for post in posts]
+    ).update(fanned_out=True)
+
+
+def deliver_history(author):
+    """
+    Fan out the posts of an author that were never pushed to timelines.
+
+    Only the latest ``FEED_BACKFILL_SIZE`` posts reach the timelines, the
+    same window a new follower gets from ``backfill_timeline``. Older posts
+    are only marked as fanned out, so that the feed never pulls them.
+
+    Args:
+        author (User): An author who is not popular.
+    """
+    pending = Post.objects.filter(author=author, fanned_out=False)
+    deliver(author, list(
+        pending.order_by('-pub_date', '-id').only('id', 'pub_date')[
+            :settings.FEED_BACKFILL_SIZE
+        ]
+    ))
+    pending.update(fanned_out=True)
+
+
+def backfill_timeline(user, author):
+    """
+    Add the latest fanned-out posts of a newly followed author to the feed.
+
+    Args:
+        user (User): The new follower.
+        author (User): The followed author.
+    """
+    posts = Post.objects.filter(
+        author=author, fanned_out=True
+    ).order_by('-pub_date', '-id').values_list(
+        'id', 'pub_date'
+    )[:settings.FEED_BACKFILL_SIZE]
+    Timeline.objects.bulk_create(
+        (Timeline(user=user, post_id=post_id, pub_date=pub_date)
+         for post_id, pub_date in posts),
+        ignore_conflicts=True,
+    )
+
+
+def trim_timeline(user, author):
+    """
+    Remove the posts of an unfollowed author from the user's feed.
+
+    Args:
+        user (User): The former follower.
+        author (User): The unfollowed author.
+    """
+    Timeline.objects.filter(user=user, post__author=author).delete()
+
+
+def keyset_page(queryset, pk_field, cursor, limit, flat=True):
+    """
+    Return up to ``limit`` keys of ``queryset`` that follow ``cursor``.
+
+    Args:
+        queryset (QuerySet): Rows with a ``pub_date`` field.
+        pk_field (str): The field holding the post id.
+        cursor (tuple | None): ``(pub_date, id, reverse)`` of the page
+            border as decoded by ``PostPagination``.
+        limit (int): The maximum number of keys.
+        flat (bool): Return bare post ids instead of ``(pub_date, id)``.
+
+    Returns:
+        QuerySet: A sliced ``values_list`` of post ids.
+    """
+    ordering = ('-pub_date', f'-{pk_field}')
+    if cursor is not None:
+        pub_date, pk, reverse = cursor
+        lookup = 'gt' if reverse else 'lt'
+        # Нестрогое сравнение даты даёт SQLite диапазон по индексу,
+        # условие с OR отсекает записи на границе.
+        queryset = queryset.filter(
+            Q(**{f'pub_date__{lookup}': pub_date})
+            | Q(pub_date=pub_date, **{f'{pk_field}__{lookup}': pk}),
+            **{f'pub_date__{lookup}e': pub_date},
+        )
+        if reverse:
+            ordering = ('pub_date', pk_field)
+    fields = (pk_field,) if flat else ('pub_date', pk_field)
+    return queryset.order_by(*ordering).values_list(
+        *fields, flat=flat
+    )[:limit]
+
+
+def feed_queryset(user, cursor=None, limit=None):
+    """
+    Build the home feed of a user.
+
+    Fanned-out posts are read from the user's timeline rows. Posts of
+    popular authors are pulled separately for each followed author with a
+    ``PopularAuthor`` row. The cursor and the limit are applied to every
+    source, so a page reads and sorts at most ``limit`` posts per source
+    no matter how long the timeline and the authors' histories are.
+
+    Sources are combined in one query by groups of
+    ``FEED_SOURCES_PER_QUERY``. A user following more popular authors gets
+    the newest ``limit`` keys of every group merged in Python.
+
+    Args:
+        user (User): The owner of the feed.
+        cursor (tuple | None): The page border, see ``keyset_page``.
+        limit (int | None): The number of posts the page needs.
+
+    Returns:
+        QuerySet: Posts to show in the feed, newest first.
+    """
+    if limit is None:
+        limit = settings.FEED_BACKFILL_SIZE
+    sources = [Q(id__in=keyset_page(
+        Timeline.objects.filter(user=user), 'post_id', cursor, limit
+    ))]
+    popular = Follow.objects.filter(
+        user=user, following__in=PopularAuthor.objects.values('author')
+    ).values_list('following', flat=True)
+    for author_id in popular:
+        sources.append(Q(id__in=keyset_page(
+            Post.objects.filter(author_id=author_id, fanned_out=False),
+            'id', cursor, limit,
+        )))
+    if len(sources) > FEED_SOURCES_PER_QUERY:
+        sources = [Q(id__in=merge_sources(sources, cursor, limit))]
+    return Post.objects.filter(reduce(or_, sources)).select_related(
+        'author'
+    ).order_by('-pub_date', '-id')
+
+
+def merge_sources(sources, cursor, limit):
+    """Return ids of the ``limit`` posts of ``sources`` next to ``cursor``."""
+    keys = []
+    for start in range(0, len(sources), FEED_SOURCES_PER_QUERY):
+        group = reduce(or_, sources[start:start + FEED_SOURCES_PER_QUERY])
+        keys += keyset_page(
+            Post.objects.filter(group), 'id', cursor, limit, flat=False
+        )
+    reverse = cursor is not None and cursor[2]
+    keys.sort(reverse=not reverse)
+    return [pk for _, pk in keys[:limit]]
@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.asgi import ASGIHandler  # noqa: E402
+
+from api.asyncviews import AsyncReadASGIHandler  # noqa: E402
+
+if settings.API_ASYNC_VIEWS:
+    application = AsyncReadASGIHandler()
+else:
+    application = ASGIHandler()
@@ -0,0 +1,12 @@
+"""
+URL configuration used by the ASGI handler.
+
+The same routes as ``yatube_api.urls``; reads of viewsets with
+``async_reads`` are served by async views.
+"""
+
+from api.asyncviews import with_async_reads
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = with_async_reads(sync_urlpatterns)
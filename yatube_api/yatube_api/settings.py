@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # from datetime import timedelta
@@ -24,13 +25,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube_api.urls'
@@ -59,6 +63,63 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами и не открывается заново.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 600)),
+    }
+}
+
+# PRAGMA, выполняемые на каждом новом соединении с SQLite. Профиль
+# 'production' включает WAL: читатели не блокируют писателя, а писатели
+# ждут освобождения базы до busy_timeout вместо ошибки "database is locked".
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # Отрицательное значение задаёт размер кеша в КиБ: 64 МиБ.
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'production')
+
+# Реплики только для чтения. Для локальной проверки достаточно копии файла
+# базы: DB_REPLICA_NAME=/path/to/replica.sqlite3.
+DATABASE_REPLICAS = []
+if os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_REPLICA_NAME'),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# Сколько секунд после записи клиент читает только из основной базы.
+DATABASE_REPLICA_LAG = int(os.getenv('DB_REPLICA_LAG', 5))
+
+# ASGI: маршруты, в которых чтение постов, комментариев и групп обслуживают
+# асинхронные представления, число потоков для работы с ORM и предел
+# одновременных запросов на процесс (сверх него - 503). Асинхронные
+# представления включаются явно: в bench_asgi они не быстрее обычного
+# ASGIHandler (99 против 130 запросов в секунду при 100 клиентах).
+API_ASYNC_VIEWS = bool(int(os.getenv('API_ASYNC_VIEWS', 0)))
+API_ASYNC_URLCONF = 'yatube_api.asgi_urls'
+API_ASYNC_WORKERS = int(os.getenv('API_ASYNC_WORKERS', 8))
+API_ASYNC_MAX_CONCURRENCY = int(os.getenv('API_ASYNC_MAX_CONCURRENCY', 1000))
+
+# Кеш в файлах общий для всех воркеров на хосте: поколения, увеличенные
+# при записи в одном процессе, сразу видны остальным. Кеш в памяти процесса
+# (LocMemCache) для нескольких воркеров не подходит - соседние процессы
+# продолжат отдавать устаревшие ответы.
+API_CACHE_DIR = Path(os.getenv('API_CACHE_DIR', BASE_DIR / 'cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': API_CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
     }
 }
 
@@ -90,15 +151,97 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.ReadWriteRateThrottle',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '10/min',
+        'write': '120/min',
+        'read': '1200/min',
+    },
+    # Число доверенных прокси перед приложением. При 0 клиент определяется
+    # по REMOTE_ADDR: X-Forwarded-For задаёт сам клиент, и с ним любой
+    # запрос попадал бы в новую корзину ограничителя.
+    'NUM_PROXIES': int(os.getenv('API_NUM_PROXIES', 0)),
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     # 'PAGE_SIZE': 10,
 }
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Авторы с таким числом подписчиков и больше не рассылают посты по лентам,
+# их публикации подтягиваются в ленту при чтении.
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+# Сколько последних постов автора добавляется в ленту при подписке.
+FEED_BACKFILL_SIZE = 100
+
+# Кеш ответов GET для постов, комментариев и групп.
+API_CACHE_ALIAS = 'default'
+API_RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+# Наибольшее число объектов в одном запросе к эндпоинтам batch.
+API_BATCH_MAX_SIZE = 100
+
+# Размеры вариантов изображений постов: имя варианта и длина большей стороны.
+POST_IMAGE_VARIANTS = {
+    'small': 320,
+    'medium': 640,
+    'large': 1280,
+}
+# Число фоновых потоков для подготовки вариантов; 0 - сразу после коммита.
+POST_IMAGE_WORKERS = 2
+
+# Списки постов, комментариев и групп сериализуются из values() без DRF-полей.
+API_FAST_LIST_SERIALIZERS = True
+
+# Кеш пользователей, найденных по JWT-токену, в памяти каждого процесса.
+API_AUTH_USER_CACHE_SIZE = 10_000
+API_AUTH_USER_CACHE_TTL = 60
+# Проверенные JWT-токены (по хешу) и их claims до истечения срока.
+API_TOKEN_CACHE_SIZE = 10_000
+
+# Отозванные токены: фильтр Блума перед таблицей api_revokedtoken.
+API_REVOCATION_BLOOM_CAPACITY = 100_000
+API_REVOCATION_BLOOM_ERROR_RATE = 0.001
+# Как часто подтягивать токены, отозванные другими процессами, и как часто
+# пересобирать фильтр без истёкших токенов (в секундах).
+API_REVOCATION_REFRESH = 5
+API_REVOCATION_REBUILD = 60 * 60
+
+# Файл SQLite с корзинами ограничителя запросов, общий для всех процессов.
+API_THROTTLE_DB = BASE_DIR / 'throttle.sqlite3'
+# Корзины, не менявшиеся дольше этого времени (в секундах), удаляются.
+API_THROTTLE_PURGE_AGE = 60 * 60
+
+# Доля запросов, профилируемых cProfile, и где хранить профили: не больше
+# API_PROFILE_RING_SIZE последних на каждое представление.
+API_PROFILE_SAMPLE_RATE = float(os.getenv('API_PROFILE_SAMPLE_RATE', 0))
+API_PROFILE_DIR = BASE_DIR / 'profiles'
+API_PROFILE_RING_SIZE = 100
+# Срок действия подписанного заголовка X-Profile (в секундах).
+API_PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Каталог файлов метрик процессов; /metrics суммирует все файлы в нём.
+API_METRICS_DIR = Path(os.getenv('API_METRICS_DIR', BASE_DIR / 'metrics'))
+
+# Заголовок Server-Timing с фазами запроса API: auth, perm, db, serialize,
+# render и total.
+API_SERVER_TIMING = bool(int(os.getenv('API_SERVER_TIMING', 0)))
+
+# Журнал запросов к базе дольше порога (в секундах, None - выключен) с
+# планом EXPLAIN QUERY PLAN; полный просмотр этих таблиц отмечается особо.
+API_SLOW_QUERY_THRESHOLD = float(os.getenv('API_SLOW_QUERY_THRESHOLD', 0.1))
+API_SLOW_QUERY_LOG = BASE_DIR / 'slow_queries.log'
+API_SLOW_QUERY_LOG_SIZE = 10 * 1024 * 1024
+API_SLOW_QUERY_LOG_BACKUPS = 5
+API_SLOW_QUERY_SCAN_TABLES = ('posts_post', 'posts_comment', 'posts_follow')